@@ -0,0 +1,101 @@
+"""
+Compare the cost of saving one change with tasks.json and with SQLite.
+
+With tasks.json every change rewrites the whole file, so the cost grows
+with the number of tasks; with SQLite a change is a single-row write.
+Runs in a temporary directory and never touches your tasks.
+
+Usage:
+    python benchmark_storage.py
+    python benchmark_storage.py --sizes 1000 100000 --changes 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from task_store import SqliteTaskStorage, write_tasks
+
+PRIORITIES = ("High", "Medium", "Low")
+
+
+def make_tasks(count):
+    return [
+        {
+            "id": index + 1,
+            "task": f"Task number {index}",
+            "completed": index % 4 == 0,
+            "priority": PRIORITIES[index % 3],
+            "date_added": "2025-05-12 19:30:48",
+        }
+        for index in range(count)
+    ]
+
+
+def per_call(function, calls):
+    start = time.perf_counter()
+    for index in range(calls):
+        function(index)
+    return (time.perf_counter() - start) / calls
+
+
+def bench_json(directory, tasks, changes):
+    path = os.path.join(directory, "tasks.json")
+    # Each change (or burst of changes) rewrites every task
+    return per_call(lambda index: write_tasks(path, tasks), max(changes // 50, 3))
+
+
+def bench_sqlite(directory, tasks, changes):
+    storage = SqliteTaskStorage(os.path.join(directory, "tasks.db"), os.path.join(directory, "missing.json"))
+    storage.open()
+    storage.import_tasks(tasks)
+    loaded = storage.load()
+
+    added = []
+
+    def add(index):
+        task = {
+            "id": len(tasks) + index + 1,
+            "task": f"New task {index}",
+            "completed": False,
+            "priority": "High",
+            "date_added": "2025-05-12 19:30:48",
+        }
+        storage.added(task)
+        added.append(task)
+
+    def change(index):
+        task = loaded[(index * 7919) % len(loaded)]
+        task["completed"] = not task["completed"]
+        storage.changed(task)
+
+    results = {
+        "add": per_call(add, changes),
+        "change": per_call(change, changes),
+        "delete": per_call(lambda index: storage.removed(added[index]), changes),
+    }
+
+    storage.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark saving one change with tasks.json and with SQLite.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="numbers of saved tasks")
+    parser.add_argument("--changes", type=int, default=200, help="changes to time per case")
+    args = parser.parse_args()
+
+    print(f"{'tasks':>10}  {'json write':>12}  {'sqlite add':>12}  {'sqlite change':>14}  {'sqlite delete':>14}")
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        with tempfile.TemporaryDirectory() as directory:
+            json_time = bench_json(directory, tasks, args.changes)
+            sqlite_times = bench_sqlite(directory, tasks, args.changes)
+        print(
+            f"{size:>10}  {json_time * 1000:>10.3f}ms  {sqlite_times['add'] * 1000:>10.3f}ms  "
+            f"{sqlite_times['change'] * 1000:>12.3f}ms  {sqlite_times['delete'] * 1000:>12.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1210 @@
+"""
+The task list without a user interface.
+
+TaskStore owns the tasks, their display order, the filter and search views,
+the status counts and saving, for the Tk app (todo_app.py) and the command
+line (todo_cli.py) alike.
+"""
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+
+# Where tasks are saved, and how long to wait for more changes before writing
+TASKS_FILE = "tasks.json"
+SAVE_DELAY_MS = 500
+
+# Optional SQLite store; used instead of tasks.json once it exists
+TASKS_DB = "tasks.db"
+
+TASKS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    task TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    priority TEXT NOT NULL DEFAULT 'Medium',
+    date_added TEXT NOT NULL,
+    date_completed TEXT
+);
+"""
+
+# Import and export files: format by extension, and the fields of each record
+RECORD_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+RECORD_FIELDS = ("id", "task", "completed", "priority", "date_added", "date_completed")
+
+# Undo steps kept
+UNDO_LIMIT = 100
+
+# Batches changing more than 1/64th of the tasks (and more than 100) re-sort
+# every task once at the end; smaller ones move each task they touch with
+# bisect, as single changes do, which is cheaper up to about that size
+BATCH_RESORT_FRACTION = 64
+BATCH_RESORT_SIZE = 100
+
+# Lines of tasks.json parsed at a time when loading it a chunk at a time
+STREAM_BLOCK_LINES = 1000
+
+# Each chunk loaded by load_more() is spliced into the ordered list where it
+# belongs if it falls in at most this many places (tasks.json is saved in
+# display order, so a chunk usually falls in one); otherwise the two lists
+# are merged by a sort
+MERGE_SPLICE_LIMIT = 64
+
+# Tasks in the first load_more() step given a time limit, which measures
+# how many tasks a second can be loaded
+LOAD_TIMING_TASKS = 1000
+
+# Words in task text, for search
+WORD_PATTERN = re.compile(r"\w+")
+
+# Sort rank of each priority; active tasks come first, then High > Medium > Low
+PRIORITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+
+# Sort-key bounds of the tasks each filter shows. Keys are (completed,
+# priority rank, id), so every filter is one or two contiguous runs of
+# the ordered task list; None means the end of the list
+FILTER_RANGES = {
+    "All": [((), None)],
+    "Active": [((False,), (True,))],
+    "Completed": [((True,), None)],
+    "High Priority": [((False, 0), (False, 1)), ((True, 0), (True, 1))],
+}
+
+def timestamp():
+    """The current time as saved in tasks; formatted once a second, as bulk changes need it a lot"""
+    now = int(time.time())
+    if now != timestamp.second:
+        timestamp.second = now
+        timestamp.text = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+    return timestamp.text
+
+timestamp.second = None
+
+def normalize_task(task):
+    """Fill in fields missing from tasks saved by older versions"""
+    if "priority" not in task:
+        task["priority"] = "Medium"
+    if "date_added" not in task:
+        task["date_added"] = timestamp()
+    return task
+
+def assign_ids(tasks):
+    """Give every task without a unique integer id the next free one, in list order"""
+    next_id = max((task["id"] for task in tasks if isinstance(task.get("id"), int)), default=0) + 1
+    seen = set()
+    for task in tasks:
+        if not isinstance(task.get("id"), int) or task["id"] in seen:
+            task["id"] = next_id
+            next_id += 1
+        seen.add(task["id"])
+    return tasks
+
+def read_tasks(path):
+    """Load tasks from a JSON file, or an empty list if there isn't one"""
+    try:
+        with open(path, "r") as f:
+            tasks = json.load(f)
+    except FileNotFoundError:
+        return []
+    
+    # Ensure all tasks have required fields
+    for task in tasks:
+        normalize_task(task)
+    return assign_ids(tasks)
+
+def stream_tasks(path):
+    """Yield the tasks in a JSON task file one at a time, without ids fixed up
+    
+    write_tasks puts every task on a line of its own, so its files are read
+    a block of lines at a time; files laid out another way (by older
+    versions) are parsed whole first.
+    """
+    try:
+        f = open(path, "r")
+    except FileNotFoundError:
+        return
+    with f:
+        if f.readline().strip() == "[":
+            number = 2
+            while True:
+                lines = [line.strip().rstrip(",") for line in islice(f, STREAM_BLOCK_LINES)]
+                if not lines:
+                    raise ValueError(f"{path} ends part way through the task list")
+                finished = "]" in lines
+                if finished:
+                    lines = lines[:lines.index("]")]
+                try:
+                    # One parse for the whole block
+                    tasks = json.loads("[" + ",".join(lines) + "]")
+                except ValueError:
+                    bad_line, error = next(
+                        (offset, e) for offset, e in enumerate(map(json_error, lines), number) if e is not None
+                    )
+                    if bad_line == 2:
+                        # Not one task per line: an older layout, parsed whole below
+                        break
+                    raise ValueError(f"{path}, line {bad_line}: {error}") from None
+                for task in tasks:
+                    yield normalize_task(task)
+                if finished:
+                    return
+                number += len(lines)
+        f.seek(0)
+        for task in json.load(f):
+            yield normalize_task(task)
+
+def json_error(text):
+    """Return why text isn't valid JSON, or None if it is"""
+    try:
+        json.loads(text)
+    except ValueError as e:
+        return e
+    return None
+
+def record_format(path, format=None):
+    """Return "csv" or "jsonl" for an import or export file, from its extension unless given"""
+    if format is not None:
+        return format
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in RECORD_FORMATS:
+        raise ValueError(f"Can't tell the format of {path}; use a .csv or .jsonl file")
+    return RECORD_FORMATS[extension]
+
+def parse_record(record):
+    """Turn an imported CSV row or JSON object into a task without an id
+    
+    Empty fields count as missing and are filled in as when loading;
+    completed may be text such as "true", "yes" or "1".
+    """
+    if not isinstance(record, dict):
+        raise ValueError("expected an object with task fields")
+    task = {field: record[field] for field in RECORD_FIELDS[1:] if record.get(field) not in (None, "")}
+    if not isinstance(task.get("task"), str):
+        raise ValueError("the task text is missing")
+    completed = task.get("completed", False)
+    if isinstance(completed, str):
+        completed = completed.strip().lower() in ("1", "true", "yes", "x")
+    task["completed"] = bool(completed)
+    if not task["completed"]:
+        task.pop("date_completed", None)
+    normalize_task(task)
+    # Fields in the same order as tasks made by the app
+    return {field: task[field] for field in RECORD_FIELDS if field in task}
+
+def read_records(path, format=None):
+    """Yield the tasks in a CSV or JSON Lines file one record at a time
+    
+    Raises ValueError naming the record for anything that isn't a task.
+    """
+    format = record_format(path, format)
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if format == "csv":
+            records = csv.DictReader(f)
+        else:
+            records = (line for line in f if line.strip())
+        try:
+            for number, record in enumerate(records, 1):
+                try:
+                    task = parse_record(record if format == "csv" else json.loads(record))
+                except ValueError as e:
+                    raise ValueError(f"{path}, record {number}: {e}") from None
+                yield task
+        except csv.Error as e:
+            raise ValueError(f"{path}: {e}") from None
+
+def write_records(path, tasks, format=None):
+    """Write tasks to a CSV or JSON Lines file one record at a time; returns how many"""
+    format = record_format(path, format)
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if format == "csv":
+            writer = csv.DictWriter(f, RECORD_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for task in tasks:
+                writer.writerow(task)
+                count += 1
+        else:
+            for task in tasks:
+                f.write(json.dumps(task) + "\n")
+                count += 1
+    return count
+
+def write_tasks(path, tasks):
+    """
+    Write tasks as a JSON list, one task per line.
+    
+    The file is written under a temporary name and renamed over the old
+    one, so a crash mid-write leaves the previous version intact.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        f.write("[")
+        f.writelines(
+            ("\n  " if index == 0 else ",\n  ") + json.dumps(task)
+            for index, task in enumerate(tasks)
+        )
+        f.write("\n]\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+class SaveScheduler:
+    """
+    Coalesces saves and writes them on a background thread.
+    
+    With a Tk root, each schedule() call restarts a short timer with after(),
+    so a burst of changes produces one write; without one (the command line)
+    changes wait for flush(). When a write starts, snapshot() is called on
+    the caller's thread and the copy is handed to the writer thread; if
+    several snapshots pile up while a write is running, only the newest is
+    written. Write errors are passed to on_error, or returned by flush().
+    """
+    
+    def __init__(self, root, snapshot, path=TASKS_FILE, delay=SAVE_DELAY_MS, on_error=None):
+        self.root = root
+        self.snapshot = snapshot
+        self.path = path
+        self.delay = delay
+        self.on_error = on_error
+        self.pending = None
+        
+        # Shared with the writer thread
+        self.condition = threading.Condition()
+        self.latest = None
+        self.writing = False
+        self.error = None
+        self.writer = None
+    
+    def schedule(self):
+        """Save soon, after any further changes in the next moment"""
+        if self.root is None:
+            # No event loop to time the write with: it happens on flush()
+            self.pending = True
+            return
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+        self.pending = self.root.after(self.delay, self.start_write)
+    
+    def start_write(self):
+        self.pending = None
+        tasks = self.snapshot()
+        with self.condition:
+            error, self.error = self.error, None
+            self.latest = tasks
+            self.condition.notify()
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.run_writer, name="task-saver", daemon=True)
+            self.writer.start()
+        if error is not None and self.on_error is not None:
+            self.on_error(error)
+    
+    def run_writer(self):
+        while True:
+            with self.condition:
+                while self.latest is None:
+                    self.condition.wait()
+                tasks, self.latest = self.latest, None
+                self.writing = True
+            try:
+                write_tasks(self.path, tasks)
+            except OSError as e:
+                with self.condition:
+                    self.error = e
+            finally:
+                with self.condition:
+                    self.writing = False
+                    self.condition.notify_all()
+    
+    def flush(self):
+        """Write any pending changes now and wait for them; returns the last write error, if any"""
+        if self.pending is not None:
+            if self.root is not None:
+                self.root.after_cancel(self.pending)
+            self.start_write()
+        with self.condition:
+            while self.latest is not None or self.writing:
+                self.condition.wait()
+            error, self.error = self.error, None
+        return error
+
+class JsonTaskStorage:
+    """Tasks in tasks.json, rewritten in the background after changes"""
+    
+    def __init__(self, snapshot, path=TASKS_FILE, root=None, on_error=None):
+        self.path = path
+        self.saver = SaveScheduler(root, snapshot, path, on_error=on_error)
+        self.batching = False
+    
+    def load(self):
+        return read_tasks(self.path)
+    
+    def stream(self):
+        return stream_tasks(self.path)
+    
+    @contextmanager
+    def batch(self):
+        """Save once for all the changes made inside"""
+        self.batching = True
+        try:
+            yield
+        finally:
+            self.batching = False
+            self.saver.schedule()
+    
+    # Any change rewrites the whole file, coalesced by the save scheduler
+    
+    def added(self, task):
+        self.schedule()
+    
+    def changed(self, task):
+        self.schedule()
+    
+    def removed(self, task):
+        self.schedule()
+    
+    def cleared(self):
+        self.schedule()
+    
+    def schedule(self):
+        if not self.batching:
+            self.saver.schedule()
+    
+    def flush(self):
+        return self.saver.flush()
+    
+    def close(self):
+        pass
+
+class SqliteTaskStorage:
+    """
+    Tasks in an SQLite database, one row per task.
+    
+    Every change is a single-row statement committed on its own, so its cost
+    doesn't grow with the number of tasks; inside batch() they are committed
+    together. On first use, an existing tasks.json is imported and renamed to
+    tasks.json.migrated.
+    """
+    
+    def __init__(self, path=TASKS_DB, json_path=TASKS_FILE):
+        self.path = path
+        self.json_path = json_path
+        self.connection = None
+        self.batching = False
+    
+    def open(self):
+        migrate = not os.path.exists(self.path) and os.path.exists(self.json_path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(TASKS_SCHEMA)
+        if migrate:
+            self.import_tasks(read_tasks(self.json_path))
+            os.replace(self.json_path, self.json_path + ".migrated")
+    
+    def import_tasks(self, tasks):
+        """Insert many tasks, which must already have ids, in one transaction"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO tasks (task, completed, priority, date_added, date_completed, id) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.task_values(normalize_task(task)) for task in tasks)
+            )
+    
+    @staticmethod
+    def task_values(task):
+        # The task id is the row id, and comes last to suit every statement
+        return (task["task"], int(task["completed"]), task["priority"], task["date_added"], task.get("date_completed"), task["id"])
+    
+    def load(self):
+        return list(self.rows())
+    
+    def stream(self):
+        return self.rows()
+    
+    def rows(self):
+        """Yield every task one at a time, in the order they were added"""
+        if self.connection is None:
+            self.open()
+        rows = self.connection.execute(
+            "SELECT id, task, completed, priority, date_added, date_completed FROM tasks ORDER BY id"
+        )
+        for row_id, text, completed, priority, date_added, date_completed in rows:
+            task = {"id": row_id, "task": text, "completed": bool(completed), "priority": priority, "date_added": date_added}
+            if date_completed is not None:
+                task["date_completed"] = date_completed
+            yield task
+    
+    def append_tasks(self, tasks):
+        """Insert tasks with new ids after the highest one, streaming them in one transaction; returns how many"""
+        if self.connection is None:
+            self.open()
+        (last_id,) = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()
+        count = 0
+        
+        def numbered():
+            nonlocal count
+            for task in tasks:
+                count += 1
+                task["id"] = last_id + count
+                yield self.task_values(task)
+        
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO tasks (task, completed, priority, date_added, date_completed, id) VALUES (?, ?, ?, ?, ?, ?)",
+                numbered()
+            )
+        return count
+    
+    @contextmanager
+    def batch(self):
+        """Commit all the changes made inside as one transaction"""
+        self.batching = True
+        try:
+            with self.connection:
+                yield
+        finally:
+            self.batching = False
+    
+    def write(self, statement, values=()):
+        self.connection.execute(statement, values)
+        if not self.batching:
+            self.connection.commit()
+    
+    def added(self, task):
+        self.write(
+            "INSERT INTO tasks (task, completed, priority, date_added, date_completed, id) VALUES (?, ?, ?, ?, ?, ?)",
+            self.task_values(task)
+        )
+    
+    def changed(self, task):
+        self.write(
+            "UPDATE tasks SET task = ?, completed = ?, priority = ?, date_added = ?, date_completed = ? WHERE id = ?",
+            self.task_values(task)
+        )
+    
+    def removed(self, task):
+        self.write("DELETE FROM tasks WHERE id = ?", (task["id"],))
+    
+    def cleared(self):
+        self.write("DELETE FROM tasks")
+    
+    def flush(self):
+        # Every change is committed as it happens, or at the end of its batch
+        return None
+    
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+def tokenize(text):
+    """Split text into lowercase words for searching"""
+    return WORD_PATTERN.findall(text.lower())
+
+class TaskSearchIndex:
+    """
+    Inverted index from the words in each task's text to the tasks.
+    
+    Every query word matches as a prefix, so results narrow as you type.
+    Prefixes are looked up by bisecting a sorted vocabulary, which is only
+    re-sorted when a search follows a change to the set of words.
+    """
+    
+    def __init__(self):
+        self.postings = {}
+        self.task_words = {}
+        self.tasks = {}
+        self.vocabulary = []
+        self.vocabulary_stale = False
+    
+    def add(self, task):
+        key = task["id"]
+        words = set(tokenize(task["task"]))
+        self.tasks[key] = task
+        self.task_words[key] = words
+        for word in words:
+            ids = self.postings.get(word)
+            if ids is None:
+                ids = self.postings[word] = set()
+                self.vocabulary_stale = True
+            ids.add(key)
+    
+    def remove(self, task):
+        key = task["id"]
+        del self.tasks[key]
+        for word in self.task_words.pop(key):
+            ids = self.postings[word]
+            ids.discard(key)
+            if not ids:
+                del self.postings[word]
+                self.vocabulary_stale = True
+    
+    def prefix_matches(self, prefix):
+        if self.vocabulary_stale:
+            self.vocabulary = sorted(self.postings)
+            self.vocabulary_stale = False
+        ids = set()
+        for index in range(bisect_left(self.vocabulary, prefix), len(self.vocabulary)):
+            word = self.vocabulary[index]
+            if not word.startswith(prefix):
+                break
+            ids |= self.postings[word]
+        return ids
+    
+    def search(self, words):
+        """Return the tasks containing a word starting with each of the given words"""
+        ids = None
+        # Longest words first: they usually match the fewest tasks
+        for word in sorted(set(words), key=len, reverse=True):
+            matches = self.prefix_matches(word)
+            ids = matches if ids is None else ids & matches
+            if not ids:
+                return []
+        return [self.tasks[key] for key in ids or ()]
+    
+    def matches(self, task, words):
+        """Check a single indexed task against the query words"""
+        task_words = self.task_words[task["id"]]
+        return all(any(word.startswith(prefix) for word in task_words) for prefix in words)
+
+class FilteredView:
+    """
+    The rows shown for the current filter and search.
+    
+    Without a search, the rows are index ranges into the ordered task list:
+    switching filters or updating after a mutation only re-bisects the range
+    bounds, so neither depends on how many tasks there are. With a search,
+    the matching tasks are kept in their own sorted list, updated with bisect
+    as tasks change.
+    """
+    
+    def __init__(self, tasks, keys):
+        self.tasks = tasks
+        self.keys = keys
+        self.bounds = FILTER_RANGES["All"]
+        self.ranges = []
+        
+        # Search results (sort keys and tasks), and a test for changed tasks
+        self.match_keys = None
+        self.match_tasks = None
+        self.accepts = None
+    
+    def set_filter(self, name):
+        self.bounds = FILTER_RANGES[name]
+        self.refresh()
+    
+    def set_matches(self, tasks, sort_key, accepts):
+        """Show only the given tasks (None ends the search); accepts(task) tests tasks that change later"""
+        self.match_keys = self.match_tasks = self.accepts = None
+        if tasks is None:
+            return
+        
+        if len(tasks) * 16 < len(self):
+            # Few matches: sort just those
+            matches = sorted((sort_key(task), task) for task in tasks)
+            matches = [(key, task) for key, task in matches if self.in_bounds(key)]
+            self.match_keys = [key for key, task in matches]
+            self.match_tasks = [task for key, task in matches]
+        else:
+            # Many matches: cheaper to walk the filtered rows, already in order
+            wanted = {task["id"] for task in tasks}
+            positions = [
+                position
+                for start, stop in self.ranges
+                for position in range(start, stop)
+                if self.tasks[position]["id"] in wanted
+            ]
+            self.match_keys = [self.keys[position] for position in positions]
+            self.match_tasks = [self.tasks[position] for position in positions]
+        self.accepts = accepts
+    
+    def in_bounds(self, key):
+        return any(low <= key and (high is None or key < high) for low, high in self.bounds)
+    
+    def refresh(self):
+        """Recompute the ranges after the ordered list changed"""
+        self.ranges = []
+        for low, high in self.bounds:
+            start = bisect_left(self.keys, low)
+            stop = len(self.keys) if high is None else bisect_left(self.keys, high, start)
+            if start < stop:
+                self.ranges.append((start, stop))
+    
+    def placed(self, task, key):
+        """Update after a task was inserted in the ordered list; return its row or None"""
+        self.refresh()
+        if self.match_keys is not None:
+            if not self.in_bounds(key) or not self.accepts(task):
+                return None
+            row = bisect_left(self.match_keys, key)
+            self.match_keys.insert(row, key)
+            self.match_tasks.insert(row, task)
+            return row
+        return self.row_of(key)
+    
+    def placed_many(self, keyed):
+        """Update after many tasks were added to the ordered list, given as
+        sorted (key, task) pairs; return the rows of those shown, in order"""
+        self.refresh()
+        shown = [(key, task) for key, task in keyed if self.in_bounds(key)]
+        if self.match_keys is not None:
+            shown = [(key, task) for key, task in shown if self.accepts(task)]
+            if len(shown) * 16 < len(self.match_keys):
+                for key, task in shown:
+                    row = bisect_left(self.match_keys, key)
+                    self.match_keys.insert(row, key)
+                    self.match_tasks.insert(row, task)
+            elif shown:
+                matches = list(zip(self.match_keys, self.match_tasks))
+                matches.extend(shown)
+                matches.sort()
+                self.match_keys[:] = [key for key, task in matches]
+                self.match_tasks[:] = [task for key, task in matches]
+        return [self.row_of(key) for key, task in shown]
+    
+    def removed(self, key):
+        """Update before a task is deleted from the ordered list; return its row or None"""
+        row = self.row_of(key)
+        if self.match_keys is not None and row is not None:
+            del self.match_keys[row]
+            del self.match_tasks[row]
+        return row
+    
+    def __len__(self):
+        if self.match_keys is not None:
+            return len(self.match_keys)
+        return sum(stop - start for start, stop in self.ranges)
+    
+    def __iter__(self):
+        if self.match_tasks is not None:
+            return iter(self.match_tasks)
+        return (self.tasks[position] for start, stop in self.ranges for position in range(start, stop))
+    
+    def __getitem__(self, row):
+        if self.match_tasks is not None:
+            return self.match_tasks[row]
+        for start, stop in self.ranges:
+            if row < stop - start:
+                return self.tasks[start + row]
+            row -= stop - start
+        raise IndexError(row)
+    
+    def row_of(self, key):
+        """Return the row showing the task with this sort key, or None"""
+        if self.match_keys is not None:
+            row = bisect_left(self.match_keys, key)
+            if row < len(self.match_keys) and self.match_keys[row] == key:
+                return row
+            return None
+        position = bisect_left(self.keys, key)
+        row = 0
+        for start, stop in self.ranges:
+            if start <= position < stop:
+                return row + position - start
+            row += stop - start
+        return None
+
+def task_row(task):
+    """Pack a task into a tuple of its fields, a fraction of the size of the dict"""
+    return tuple(task.get(field) for field in RECORD_FIELDS)
+
+def row_task(row):
+    """Unpack a task from task_row()"""
+    return {field: value for field, value in zip(RECORD_FIELDS, row) if value is not None}
+
+def sort_key(task):
+    # Sort tasks by completion status and priority (High > Medium > Low),
+    # then by the order they were added (ids only ever increase)
+    return (task["completed"], PRIORITY_ORDER.get(task.get("priority", "Medium"), 1), task["id"])
+
+class TaskStore:
+    """
+    Every task, kept in display order, with the rows of the current view.
+    
+    Each change goes through add, update, delete or clear, which move the
+    task in the ordered list with bisect, keep the counts and search index
+    up to date, tell the storage, and report the rows that appeared or
+    disappeared to the listener (an object with row_inserted, rows_inserted,
+    row_deleted and reset, such as the Tk task list). Inside a large
+    batch(), the ordered list is instead rebuilt once at the end, which is
+    much cheaper for many changes at a time.
+    
+    Every change also records the operation that reverses it, for undo and
+    redo: ("remove", ids), ("restore", rows) with rows from task_row(), or
+    ("update", id, ((field, old value), ...)). A batch is a single step.
+    
+    Tasks are saved to tasks.json, or to SQLite if asked for or already in
+    use. Without a Tk root, saves to tasks.json wait for flush().
+    
+    load() reads every task before returning. For a quick start, use
+    start_loading() and then load_more() a chunk at a time instead: the
+    tasks, counts and view grow with each chunk, and any change first loads
+    the rest, so changes always see every task.
+    """
+    
+    def __init__(self, use_sqlite=False, root=None, on_save_error=None, path=TASKS_FILE, db_path=TASKS_DB, undo_limit=UNDO_LIMIT):
+        # Every task by its id
+        self.tasks = {}
+        self.next_id = 1
+        
+        # All tasks in display order with their sort keys, and the rows of
+        # the current filter and search
+        self.order = []
+        self.order_keys = []
+        self.visible = FilteredView(self.order, self.order_keys)
+        self.filter_name = "All"
+        self.query = ""
+        
+        # Tasks per (completed, priority) and completed tasks per day
+        self.task_counts = Counter()
+        self.completed_on = Counter()
+        
+        # Word index for searches, built on the first one
+        self.search_index = None
+        
+        self.listener = None
+        self.batching = False
+        
+        # The tasks still to come after start_loading(), those whose saved
+        # id was missing or taken (given new ids once every id is known),
+        # the error that stopped loading, if any, the tasks per second the
+        # last step loaded, and whether that step had to merge by a sort
+        self.loading = None
+        self.unnumbered = []
+        self.load_error = None
+        self.load_rate = None
+        self.load_scattered = False
+        
+        # Steps of inverse operations, newest last, and the step being
+        # recorded by a batch, undo or redo (None between changes)
+        self.undo_limit = undo_limit
+        self.undo_steps = []
+        self.redo_steps = []
+        self.recording = None
+        
+        if use_sqlite or os.path.exists(db_path):
+            self.storage = SqliteTaskStorage(db_path, path)
+        else:
+            self.storage = JsonTaskStorage(self.snapshot, path, root, on_save_error)
+    
+    def load(self):
+        self.tasks = {task["id"]: task for task in self.storage.load()}
+        self.next_id = max(self.tasks, default=0) + 1
+        self.rebuild()
+    
+    # Loading a chunk at a time
+    
+    def start_loading(self):
+        """Start loading the saved tasks with load_more(), from an empty list"""
+        self.loading = iter(self.storage.stream())
+        self.unnumbered = []
+        self.load_error = None
+        self.load_rate = None
+        self.load_scattered = False
+        self.tasks = {}
+        self.next_id = 1
+        self.rebuild()
+    
+    def load_more(self, count=None, seconds=None):
+        """Load up to count more tasks, or about as many as fit in the given seconds
+        
+        With a time limit, the number of tasks is taken from how fast the
+        previous step loaded, reading and merging included, but is at least
+        a quarter of those loaded so far if the file is not in display order,
+        as each such step sorts the whole ordered list. The tasks are added
+        to the order, counts, search index and view, and their rows reported
+        to the listener. Returns True while there are more to load. A read
+        error is raised again by every later call (and so by every change),
+        as the task list is incomplete and must not be saved.
+        """
+        if self.load_error is not None:
+            raise self.load_error
+        if self.loading is None:
+            return False
+        started = time.perf_counter()
+        if seconds is not None:
+            count = LOAD_TIMING_TASKS if self.load_rate is None else max(int(seconds * self.load_rate), 1)
+            if self.load_scattered:
+                count = max(count, len(self.order) // 4)
+        tasks = []
+        read = 0
+        try:
+            for task in islice(self.loading, count):
+                read += 1
+                task_id = task.get("id")
+                if not isinstance(task_id, int) or task_id in self.tasks:
+                    self.unnumbered.append(task)
+                    continue
+                self.tasks[task_id] = task
+                self.next_id = max(self.next_id, task_id + 1)
+                tasks.append(task)
+        except (OSError, ValueError) as e:
+            self.load_error = e
+            self.loading = None
+            raise
+        more = read == count
+        if not more:
+            # Every saved id is known now: number the rest after them, as load() does
+            for task in self.unnumbered:
+                task["id"] = self.next_id
+                self.next_id += 1
+                self.tasks[task["id"]] = task
+                tasks.append(task)
+            self.unnumbered = []
+            self.loading = None
+        self.load_scattered = self.merge(tasks)
+        self.load_rate = read / max(time.perf_counter() - started, 1e-6)
+        return more
+    
+    def ensure_loaded(self):
+        """Load every task still to come, as one chunk, before a change"""
+        self.load_more()
+    
+    def merge(self, tasks):
+        """Add newly loaded tasks to the ordered list, counts, search index and view
+        
+        Returns True if they were scattered over too many places to splice
+        in, and were merged by a sort instead.
+        """
+        keyed = sorted((sort_key(task), task) for task in tasks)
+        
+        # Group the new tasks by where they go in the ordered list; a task
+        # goes with the one before it if it sorts before the next old key
+        places = []
+        bound = None
+        splice = True
+        for key, task in keyed:
+            if places and (bound is None or key < bound):
+                places[-1][1].append(key)
+                places[-1][2].append(task)
+                continue
+            if len(places) == MERGE_SPLICE_LIMIT:
+                splice = False
+                break
+            position = bisect_left(self.order_keys, key)
+            bound = self.order_keys[position] if position < len(self.order_keys) else None
+            places.append((position, [key], [task]))
+        
+        if splice:
+            # From the end, so earlier positions stay valid
+            for position, keys, new_tasks in reversed(places):
+                self.order_keys[position:position] = keys
+                self.order[position:position] = new_tasks
+        else:
+            # Two sorted runs, which the sort merges in one pass
+            merged = list(zip(self.order_keys, self.order))
+            merged.extend(keyed)
+            merged.sort()
+            self.order_keys[:] = [key for key, task in merged]
+            self.order[:] = [task for key, task in merged]
+        
+        for task in tasks:
+            self.count_task(task, 1)
+            if self.search_index is not None:
+                self.search_index.add(task)
+        # Only the new tasks are checked against the filter and search
+        rows = self.visible.placed_many(keyed)
+        if rows and self.listener is not None:
+            self.listener.rows_inserted(rows)
+        return not splice
+    
+    def __len__(self):
+        return len(self.tasks)
+    
+    def row_of(self, task_id):
+        """Return the row showing a task, or None if it's missing or filtered out"""
+        task = self.tasks.get(task_id)
+        return None if task is None else self.visible.row_of(sort_key(task))
+    
+    # Changes
+    
+    def add(self, text, priority="Medium"):
+        self.ensure_loaded()
+        task = {
+            "id": self.next_id,
+            "task": text,
+            "completed": False,
+            "priority": priority,
+            "date_added": timestamp()
+        }
+        self.next_id += 1
+        self.insert(task)
+        return task
+    
+    def import_tasks(self, tasks):
+        """Add tasks read from a file with new ids, in one batch; returns how many
+        
+        If reading fails part way, none of them are kept.
+        """
+        self.ensure_loaded()
+        first_id = self.next_id
+        with self.batch():
+            try:
+                for task in tasks:
+                    task = {"id": self.next_id, **task}
+                    self.next_id += 1
+                    self.insert(task)
+            except BaseException:
+                # SQLite rolls back the batch; the task list is undone here
+                for task_id in range(first_id, self.next_id):
+                    self.tasks.pop(task_id, None)
+                self.next_id = first_id
+                raise
+        return self.next_id - first_id
+    
+    def insert(self, task):
+        self.ensure_loaded()
+        self.record("remove", task["id"])
+        self.tasks[task["id"]] = task
+        self.place(task)
+        self.storage.added(task)
+    
+    def update(self, task, /, **changes):
+        """Change a task's fields (None removes a field) and move its row"""
+        self.ensure_loaded()
+        self.record("update", task["id"], tuple((field, task.get(field)) for field in changes))
+        self.unplace(task)
+        for field, value in changes.items():
+            if value is None:
+                task.pop(field, None)
+            else:
+                task[field] = value
+        self.place(task)
+        self.storage.changed(task)
+    
+    def set_completed(self, task, completed=True):
+        """Mark a task completed now, or active again"""
+        if completed:
+            self.update(task, completed=True, date_completed=timestamp())
+        else:
+            self.update(task, completed=False, date_completed=None)
+    
+    def delete(self, task):
+        self.ensure_loaded()
+        self.record("restore", task_row(task))
+        self.unplace(task)
+        del self.tasks[task["id"]]
+        self.storage.removed(task)
+    
+    def clear(self):
+        self.ensure_loaded()
+        with self.undo_step():
+            for task in self.tasks.values():
+                self.record("restore", task_row(task))
+        self.tasks = {}
+        self.rebuild()
+        self.storage.cleared()
+    
+    @contextmanager
+    def batch(self, size=None):
+        """Make many changes with one view update, one save and one undo step
+        
+        Unless size says there are only a few changes, the tasks are re-sorted
+        once at the end instead of being moved one at a time.
+        """
+        self.ensure_loaded()
+        resort = size is None or size > max(BATCH_RESORT_SIZE, len(self.tasks) // BATCH_RESORT_FRACTION)
+        self.batching = resort
+        try:
+            with self.undo_step(), self.storage.batch():
+                yield self
+        finally:
+            self.batching = False
+            if resort:
+                self.rebuild()
+    
+    # Undo and redo
+    
+    @contextmanager
+    def undo_step(self):
+        """Record the changes made inside as one undo step (or as part of the enclosing one)"""
+        if self.recording is not None:
+            yield
+            return
+        self.recording = []
+        try:
+            yield
+        except BaseException:
+            # A change that failed part way can't be replayed reliably
+            self.recording = None
+            raise
+        step, self.recording = self.recording, None
+        if step:
+            self.push_step(step)
+    
+    def push_step(self, step):
+        self.undo_steps.append(step)
+        del self.undo_steps[:-self.undo_limit]
+        # A new change can't be redone past
+        self.redo_steps.clear()
+    
+    def record(self, kind, *operands):
+        """Note the inverse of a change, joining it to the last one where possible"""
+        if not self.undo_limit:
+            return
+        if self.recording is None:
+            # A change on its own is a step of its own
+            step = []
+            self.push_step(step)
+        else:
+            step = self.recording
+        if kind == "update":
+            step.append((kind, *operands))
+        elif step and step[-1][0] == kind:
+            # Consecutive removals or restores share one list of ids or rows
+            step[-1][1].append(operands[0])
+        else:
+            step.append((kind, [operands[0]]))
+    
+    def undo(self):
+        """Reverse the last change; returns False if there was nothing to undo"""
+        if not self.undo_steps:
+            return False
+        self.redo_steps.append(self.replay(self.undo_steps.pop()))
+        return True
+    
+    def redo(self):
+        """Make the last undone change again; returns False if there was nothing to redo"""
+        if not self.redo_steps:
+            return False
+        self.undo_steps.append(self.replay(self.redo_steps.pop()))
+        return True
+    
+    def replay(self, step):
+        """Apply a step's operations, newest first, and return the step that reverses them"""
+        self.recording = []
+        try:
+            with self.batch(sum(1 if kind == "update" else len(operands[0]) for kind, *operands in step)):
+                self.apply(step)
+            return self.recording
+        finally:
+            self.recording = None
+    
+    def apply(self, step):
+        for kind, *operands in reversed(step):
+            if kind == "remove":
+                for task_id in reversed(operands[0]):
+                    self.delete(self.tasks[task_id])
+            elif kind == "restore":
+                for row in reversed(operands[0]):
+                    self.insert(row_task(row))
+            else:
+                task_id, fields = operands
+                self.update(self.tasks[task_id], **dict(fields))
+    
+    # The filtered and searched view
+    
+    def set_view(self, filter_name, query=""):
+        """Show the tasks passing a filter whose text has words starting with each query word"""
+        self.filter_name = filter_name
+        self.query = query
+        self.visible.set_filter(filter_name)
+        words = tokenize(query)
+        if words:
+            # The index is built on the first search, then kept up to date
+            if self.search_index is None:
+                self.search_index = TaskSearchIndex()
+                for task in self.tasks.values():
+                    self.search_index.add(task)
+            self.visible.set_matches(
+                self.search_index.search(words),
+                sort_key,
+                lambda task: self.search_index.matches(task, words)
+            )
+        else:
+            self.visible.set_matches(None, None, None)
+    
+    def summary(self):
+        """Counts for the status bar, read from the maintained counters"""
+        active = {priority: self.task_counts[False, priority] for priority in PRIORITY_ORDER}
+        active_count = sum(number for (completed, _), number in self.task_counts.items() if not completed)
+        return {
+            "total": len(self.tasks),
+            "active": active_count,
+            "completed": len(self.tasks) - active_count,
+            "completed_today": self.completed_on[datetime.now().strftime("%Y-%m-%d")],
+            "active_by_priority": active,
+        }
+    
+    # Keeping the order, counts and view in step with the tasks
+    
+    def place(self, task):
+        """Insert a task in the ordered list and tell the listener if its row is shown"""
+        if self.batching:
+            return
+        key = sort_key(task)
+        position = bisect_left(self.order_keys, key)
+        self.order.insert(position, task)
+        self.order_keys.insert(position, key)
+        self.count_task(task, 1)
+        if self.search_index is not None:
+            self.search_index.add(task)
+        row = self.visible.placed(task, key)
+        if row is not None and self.listener is not None:
+            self.listener.row_inserted(row)
+    
+    def unplace(self, task):
+        """Take a task out of the ordered list, and its row out of the view
+        
+        Must be called before the task is changed, so it's found by the same
+        key it was placed with and counted out with the same fields.
+        """
+        if self.batching:
+            return
+        key = sort_key(task)
+        position = bisect_left(self.order_keys, key)
+        self.count_task(task, -1)
+        if self.search_index is not None:
+            self.search_index.remove(task)
+        row = self.visible.removed(key)
+        del self.order[position]
+        del self.order_keys[position]
+        self.visible.refresh()
+        if row is not None and self.listener is not None:
+            self.listener.row_deleted(row)
+    
+    def count_task(self, task, sign):
+        """Add a task to (sign=1) or remove it from (sign=-1) the status counts"""
+        self.task_counts[task["completed"], task.get("priority", "Medium")] += sign
+        if task["completed"] and "date_completed" in task:
+            self.completed_on[task["date_completed"][:10]] += sign
+    
+    def rebuild(self):
+        """Sort, count and filter every task from scratch, after loading, clearing or a batch"""
+        # Updated in place because the filtered view reads from these lists;
+        # keys are unique (they end with the id), so tasks are never compared
+        keyed = sorted((sort_key(task), task) for task in self.tasks.values())
+        self.order_keys[:] = [key for key, task in keyed]
+        self.order[:] = [task for key, task in keyed]
+        self.task_counts.clear()
+        self.completed_on.clear()
+        for task in self.tasks.values():
+            self.count_task(task, 1)
+        # Built again on the next search
+        self.search_index = None
+        self.set_view(self.filter_name, self.query)
+        if self.listener is not None:
+            self.listener.reset()
+    
+    # Saving
+    
+    def snapshot(self):
+        # In display order, so the first lines of tasks.json are the first
+        # rows shown (but the ordered list is out of date inside a batch).
+        # Tasks are changed in place, so the writer gets copies
+        tasks = self.tasks.values() if self.batching else self.order
+        return [dict(task) for task in tasks]
+    
+    def flush(self):
+        """Save any pending changes now; returns the last save error, if any"""
+        return self.storage.flush()
+    
+    def close(self):
+        self.storage.close()
@@ -1,8 +1,28 @@
 import tkinter as tk
-from tkinter import messagebox, simpledialog, ttk
-import json
-import os
-from datetime import datetime
+from tkinter import filedialog, messagebox, simpledialog, ttk
+from tkinter import font as tkfont
+import argparse
+import gc
+import sys
+import time
+from bisect import bisect_right
+
+from task_store import TASKS_DB, TASKS_FILE, TaskStore, read_records, write_records
+
+# How long to wait after the last keystroke before searching
+SEARCH_DELAY_MS = 150
+
+# Files offered by Import Tasks and Export Tasks
+RECORD_FILE_TYPES = [("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl *.ndjson")]
+
+# With --fast-start, tasks loaded before the window first appears (more than
+# fit on a screen), then the milliseconds each step in the background may
+# take, between events, so the window stays responsive
+FIRST_SCREEN_TASKS = 200
+LOAD_STEP_MS = 20
+
+# When the program started, for the startup times printed by --timing
+STARTED = time.perf_counter()
 
 class ModernButton(tk.Button):
     def __init__(self, master=None, **kwargs):
@@ -24,8 +44,253 @@ class ModernButton(tk.Button):
     def on_leave(self, event):
         self.config(bg=self.original_color)
 
+class VirtualTaskList(tk.Canvas):
+    """
+    Scrollable task list that only draws the rows in view.
+    
+    The rows live in a sequence owned by the caller; describe(row_item)
+    returns the (text, style) to show for one of them. A small pool of canvas
+    items, one per line that fits in the window, is reused while scrolling,
+    so memory and redraw cost depend on the window height, not on the number
+    of tasks. Colors come from the style tags, with one itemconfigure per
+    style rather than one per row.
+    
+    The caller reports changes with row_inserted, row_deleted and reset;
+    redraws are coalesced into one per idle cycle.
+    
+    Selection works like a Listbox in extended mode: click selects a row,
+    Ctrl+click toggles one, Shift+click and Shift+arrows select the range
+    from the anchor row, and Ctrl+A selects every row.
+    """
+    
+    def __init__(self, master, rows, describe, styles, font, yscrollcommand=None, **kwargs):
+        super().__init__(master, highlightthickness=0, bd=0, **kwargs)
+        self.rows = rows
+        self.describe = describe
+        self.styles = styles
+        self.font = tkfont.Font(font=font)
+        self.row_height = self.font.metrics("linespace") + 6
+        self.yscrollcommand = yscrollcommand
+        
+        self.top = 0
+        self.slots = []
+        
+        # Selected rows, the row ranges start from, and the keyboard cursor
+        self.selected = set()
+        self.anchor = None
+        self.active = None
+        self.redraw_pending = None
+        
+        self.bind("<Configure>", lambda event: self.schedule_redraw())
+        self.bind("<Button-1>", self.on_click)
+        self.bind("<Control-Button-1>", self.on_control_click)
+        self.bind("<Shift-Button-1>", self.on_shift_click)
+        self.bind("<MouseWheel>", self.on_mousewheel)
+        self.bind("<Button-4>", lambda event: self.yview("scroll", -3, "units"))
+        self.bind("<Button-5>", lambda event: self.yview("scroll", 3, "units"))
+        self.bind("<Up>", lambda event: self.move_selection(-1))
+        self.bind("<Down>", lambda event: self.move_selection(1))
+        self.bind("<Prior>", lambda event: self.move_selection(-self.page_size()))
+        self.bind("<Next>", lambda event: self.move_selection(self.page_size()))
+        self.bind("<Shift-Up>", lambda event: self.move_selection(-1, extend=True))
+        self.bind("<Shift-Down>", lambda event: self.move_selection(1, extend=True))
+        self.bind("<Shift-Prior>", lambda event: self.move_selection(-self.page_size(), extend=True))
+        self.bind("<Shift-Next>", lambda event: self.move_selection(self.page_size(), extend=True))
+        self.bind("<Control-a>", lambda event: self.select_all())
+    
+    # Listbox-compatible selection and lookup
+    
+    def curselection(self):
+        return tuple(sorted(self.selected))
+    
+    def selection_set(self, first, last=None):
+        """Add a row, or the rows from first to last inclusive, to the selection"""
+        last = first if last is None else min(last, len(self.rows) - 1)
+        self.selected.update(range(first, last + 1))
+        if self.anchor is None:
+            self.anchor = self.active = first
+        self.schedule_redraw()
+    
+    def selection_clear(self, first=None, last=None):
+        self.selected = set()
+        self.schedule_redraw()
+    
+    def selection_includes(self, row):
+        return row in self.selected
+    
+    def select_only(self, row):
+        self.selected = {row}
+        self.anchor = self.active = row
+        self.schedule_redraw()
+    
+    def select_all(self):
+        self.selected = set(range(len(self.rows)))
+        self.schedule_redraw()
+    
+    def nearest(self, y):
+        if not self.rows:
+            return -1
+        return min(self.top + max(int(y), 0) // self.row_height, len(self.rows) - 1)
+    
+    def see(self, row):
+        if row < self.top:
+            self.top = row
+        elif row >= self.top + self.page_size():
+            self.top = row - self.page_size() + 1
+        self.schedule_redraw()
+    
+    # Change notifications from the owner of the rows
+    
+    def row_inserted(self, row):
+        # Selected rows below the new one move down with their tasks
+        self.selected = {selected + 1 if selected >= row else selected for selected in self.selected}
+        if self.anchor is not None and self.anchor >= row:
+            self.anchor += 1
+        if self.active is not None and self.active >= row:
+            self.active += 1
+        self.schedule_redraw()
+    
+    def rows_inserted(self, rows):
+        """Many rows were inserted at once, given by their new rows in order"""
+        # Rows before each insertion, in the old numbering; an old row moves
+        # down by the number of rows inserted at or before it
+        before = [row - i for i, row in enumerate(rows)]
+        def moved(old):
+            return old + bisect_right(before, old)
+        self.selected = {moved(selected) for selected in self.selected}
+        if self.anchor is not None:
+            self.anchor = moved(self.anchor)
+        if self.active is not None:
+            self.active = moved(self.active)
+        if self.top > 0:
+            # Keep the rows in view where they are
+            self.top = moved(self.top)
+        self.schedule_redraw()
+    
+    def row_deleted(self, row):
+        self.selected = {selected - 1 if selected > row else selected for selected in self.selected if selected != row}
+        if self.anchor is not None and self.anchor > row:
+            self.anchor -= 1
+        if self.active is not None and self.active > row:
+            self.active -= 1
+        self.schedule_redraw()
+    
+    def reset(self):
+        """Forget the selection and scroll position after the rows were replaced"""
+        self.top = 0
+        self.selected = set()
+        self.anchor = self.active = None
+        self.schedule_redraw()
+    
+    # Scrolling
+    
+    def page_size(self):
+        return max(self.winfo_height() // self.row_height, 1)
+    
+    def yview(self, *args):
+        """Scrollbar protocol: "moveto fraction" or "scroll n units|pages" """
+        if not args:
+            return self.view_fractions()
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= max(self.page_size() - 1, 1)
+            self.top += amount
+        self.schedule_redraw()
+    
+    def view_fractions(self):
+        total = len(self.rows)
+        if not total:
+            return 0.0, 1.0
+        return self.top / total, min((self.top + self.page_size()) / total, 1.0)
+    
+    def on_mousewheel(self, event):
+        self.yview("scroll", -3 if event.delta > 0 else 3, "units")
+    
+    def on_click(self, event):
+        self.focus_set()
+        row = self.nearest(event.y)
+        if row >= 0:
+            self.select_only(row)
+    
+    def on_control_click(self, event):
+        self.focus_set()
+        row = self.nearest(event.y)
+        if row >= 0:
+            self.selected ^= {row}
+            self.anchor = self.active = row
+            self.schedule_redraw()
+    
+    def on_shift_click(self, event):
+        self.focus_set()
+        row = self.nearest(event.y)
+        if row >= 0:
+            self.select_range(row)
+    
+    def select_range(self, row):
+        """Select the rows from the anchor to this one, and only those"""
+        if self.anchor is None or self.anchor >= len(self.rows):
+            self.select_only(row)
+            return
+        self.selected = set(range(min(self.anchor, row), max(self.anchor, row) + 1))
+        self.active = row
+        self.schedule_redraw()
+    
+    def move_selection(self, step, extend=False):
+        if not self.rows:
+            return
+        row = 0 if self.active is None else min(max(self.active + step, 0), len(self.rows) - 1)
+        if extend:
+            self.select_range(row)
+        else:
+            self.select_only(row)
+        self.see(row)
+    
+    # Drawing
+    
+    def schedule_redraw(self):
+        if self.redraw_pending is None:
+            self.redraw_pending = self.after_idle(self.redraw)
+    
+    def redraw(self):
+        self.redraw_pending = None
+        visible = self.page_size() + 1
+        self.top = max(min(self.top, len(self.rows) - visible + 1), 0)
+        width = self.winfo_width()
+        
+        # Grow the pool of recycled row items when the window gets taller
+        while len(self.slots) < visible:
+            background = self.create_rectangle(0, 0, 0, 0, width=0)
+            text = self.create_text(0, 0, anchor=tk.W, font=self.font)
+            self.slots.append((background, text))
+        
+        for index, (background, text) in enumerate(self.slots):
+            row = self.top + index
+            if row >= len(self.rows) or index >= visible:
+                self.itemconfigure(background, state=tk.HIDDEN)
+                self.itemconfigure(text, state=tk.HIDDEN)
+                continue
+            
+            label, style = self.describe(self.rows[row])
+            if row in self.selected:
+                style = "selected"
+            y = index * self.row_height
+            self.coords(background, 0, y, width, y + self.row_height)
+            self.coords(text, 8, y + self.row_height // 2)
+            self.itemconfigure(background, state=tk.NORMAL, tags=(f"{style}-bg",))
+            self.itemconfigure(text, state=tk.NORMAL, text=label, tags=(f"{style}-fg",))
+        
+        for style, colors in self.styles.items():
+            self.itemconfigure(f"{style}-bg", fill=colors["bg"])
+            self.itemconfigure(f"{style}-fg", fill=colors["fg"])
+        
+        if self.yscrollcommand:
+            self.yscrollcommand(*self.view_fractions())
+
 class TodoApp:
-    def __init__(self, root):
+    def __init__(self, root, use_sqlite=False, fast_start=False, timing=False):
         self.root = root
         self.root.title("To-Do List Manager")
         self.root.geometry("650x550")
@@ -63,34 +328,101 @@ class TodoApp:
         self.style.theme_use('clam')
         self.style.configure('TCombobox', fieldbackground=self.bg_color, background=self.bg_color)
         
-        # Data storage
-        self.tasks = []
-        self.load_tasks()
+        # Data storage: the tasks in display order, the rows of the current
+        # filter and search, and the status bar counts, saved to tasks.json
+        # by default or SQLite if asked for or already in use
+        self.store = TaskStore(use_sqlite, root=self.root, on_save_error=self.show_save_error)
+        if fast_start:
+            # Only the first screenful before the window appears; the rest
+            # load a chunk at a time once it's up
+            self.store.start_loading()
+            self.store.load_more(FIRST_SCREEN_TASKS)
+        else:
+            self.store.load()
+        self.timing = timing
+        self.search_pending = None
         
         # Initialize status_var first
         self.status_var = tk.StringVar()
-        self.status_var.set(f"Total Tasks: {len(self.tasks)}")
+        self.status_var.set(f"Total Tasks: {len(self.store)}")
         
         # Create main frame
         self.main_frame = tk.Frame(self.root, bg=self.bg_color)
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
         # App components
+        self.create_menu()
         self.create_header()
         self.create_task_entry()
         self.create_buttons()
+        self.create_search_bar()
         self.create_task_listbox()
         self.create_status_bar()
         
         # Bind Enter key to add_task
         self.root.bind('<Return>', lambda event: self.add_task())
         
+        # Undo and redo any change, including deletes and Clear All
+        self.root.bind('<Control-z>', lambda event: self.undo())
+        self.root.bind('<Control-y>', lambda event: self.redo())
+        self.root.bind('<Control-Z>', lambda event: self.redo())
+        
         # Bind double-click to edit_task
         self.task_listbox.bind('<Double-1>', lambda event: self.edit_task())
         
         # Bind right-click to show context menu
         self.task_listbox.bind("<Button-3>", self.show_context_menu)
         
+        # Write any unsaved changes before the window closes
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Runs once the event loop starts
+        self.root.after(0, self.on_first_paint)
+    
+    def on_first_paint(self):
+        """Draw the window, then load any tasks still to come"""
+        self.root.update_idletasks()
+        if self.timing:
+            print(f"First paint after {time.perf_counter() - STARTED:.3f}s, showing {len(self.store)} tasks", file=sys.stderr)
+        if self.store.loading is not None:
+            self.load_more_tasks()
+    
+    def load_more_tasks(self):
+        """Load tasks for one step after a fast start, then let waiting events run"""
+        try:
+            # Otherwise the thousands of objects a step creates set off
+            # collections that scan every task loaded so far, pausing the
+            # step; between steps they are collected as usual
+            gc.disable()
+            try:
+                more = self.store.load_more(seconds=LOAD_STEP_MS / 1000)
+            finally:
+                gc.enable()
+        except (OSError, ValueError) as e:
+            # Saving the tasks read so far would lose the rest
+            messagebox.showerror("Error", f"Could not load tasks: {e}\n\nThe app will close without saving.")
+            self.store.close()
+            self.root.destroy()
+            return
+        
+        self.update_status()
+        if more:
+            self.root.after(1, self.load_more_tasks)
+        elif self.timing:
+            print(f"All {len(self.store)} tasks loaded after {time.perf_counter() - STARTED:.3f}s", file=sys.stderr)
+    
+    def create_menu(self):
+        menu_bar = tk.Menu(self.root)
+        file_menu = tk.Menu(menu_bar, tearoff=0)
+        file_menu.add_command(label="Import Tasks...", command=self.import_tasks)
+        file_menu.add_command(label="Export Tasks...", command=self.export_tasks)
+        menu_bar.add_cascade(label="File", menu=file_menu)
+        edit_menu = tk.Menu(menu_bar, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        menu_bar.add_cascade(label="Edit", menu=edit_menu)
+        self.root.config(menu=menu_bar)
+    
     def create_header(self):
         header_frame = tk.Frame(self.main_frame, bg=self.header_color, height=60)
         header_frame.pack(fill=tk.X, pady=(0, 20))
@@ -253,6 +585,45 @@ class TodoApp:
         # Bind filter change event
         filter_dropdown.bind("<<ComboboxSelected>>", lambda event: self.update_listbox())
     
+    def create_search_bar(self):
+        search_frame = tk.Frame(self.main_frame, bg=self.bg_color)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        search_label = tk.Label(search_frame, text="Search:", bg=self.bg_color, font=("Helvetica", 10))
+        search_label.pack(side=tk.LEFT, padx=5)
+        
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(
+            search_frame,
+            textvariable=self.search_var,
+            font=("Helvetica", 11),
+            bg="white",
+            fg="#333333",
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground="#dddddd",
+            highlightcolor=self.accent_color
+        )
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, ipady=4)
+        
+        # Filter as you type, once typing pauses
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
+        
+        # Search right away on Enter instead of adding a task
+        search_entry.bind("<Return>", lambda event: self.run_search() or "break")
+        search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+    
+    def schedule_search(self):
+        if self.search_pending is not None:
+            self.root.after_cancel(self.search_pending)
+        self.search_pending = self.root.after(SEARCH_DELAY_MS, self.run_search)
+    
+    def run_search(self):
+        if self.search_pending is not None:
+            self.root.after_cancel(self.search_pending)
+            self.search_pending = None
+        self.update_listbox()
+    
     def create_task_listbox(self):
         list_frame = tk.Frame(self.main_frame, bg=self.bg_color)
         list_frame.pack(fill=tk.BOTH, expand=True, pady=10)
@@ -271,25 +642,34 @@ class TodoApp:
         listbox_container = tk.Frame(list_frame, bg=self.bg_color, relief=tk.FLAT, bd=1, highlightbackground="#dddddd", highlightthickness=1)
         listbox_container.pack(fill=tk.BOTH, expand=True)
         
-        self.task_listbox = tk.Listbox(
+        scrollbar = ttk.Scrollbar(listbox_container)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Row colors by style: priority for active tasks, gray for completed ones
+        row_styles = {
+            priority: {"bg": color, "fg": "black"}
+            for priority, color in self.priority_colors.items()
+        }
+        row_styles["default"] = {"bg": self.bg_color, "fg": "black"}
+        row_styles["completed"] = {"bg": "#f9f9f9", "fg": "#999999"}
+        row_styles["selected"] = {"bg": self.accent_color, "fg": "black"}
+        
+        # Only the rows in view are drawn, so this stays fast with any number of tasks
+        self.task_listbox = VirtualTaskList(
             listbox_container,
+            rows=self.store.visible,
+            describe=self.describe_task,
+            styles=row_styles,
             font=("Helvetica", 11),
-            selectbackground=self.accent_color,
-            selectforeground="black",
-            activestyle="none",
-            relief=tk.FLAT,
-            bd=0,
-            highlightthickness=0,
-            selectmode=tk.SINGLE
+            yscrollcommand=scrollbar.set,
+            bg="white"
         )
         self.task_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        scrollbar = ttk.Scrollbar(listbox_container)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.task_listbox.config(yscrollcommand=scrollbar.set)
         scrollbar.config(command=self.task_listbox.yview)
         
+        # Rows appear and disappear as the store changes
+        self.store.listener = self.task_listbox
         self.update_listbox()
     
     def create_status_bar(self):
@@ -320,20 +700,27 @@ class TodoApp:
     def show_context_menu(self, event):
         try:
             selected_index = self.task_listbox.nearest(event.y)
-            if selected_index >= 0 and selected_index < len(self.tasks):
-                self.task_listbox.selection_clear(0, tk.END)
-                self.task_listbox.selection_set(selected_index)
+            if selected_index >= 0 and selected_index < len(self.store.visible):
+                # Act on the whole selection when clicking inside it
+                if not self.task_listbox.selection_includes(selected_index):
+                    self.task_listbox.select_only(selected_index)
+                tasks = self.selected_tasks()
+                count = f"{len(tasks)} Tasks" if len(tasks) > 1 else "Task"
                 
                 # Create popup menu
                 popup_menu = tk.Menu(self.root, tearoff=0)
                 
-                popup_menu.add_command(label="Edit Task", command=self.edit_task)
+                popup_menu.add_command(
+                    label="Edit Task",
+                    command=self.edit_task,
+                    state=tk.NORMAL if len(tasks) == 1 else tk.DISABLED
+                )
                 
                 # Check completion status
-                if self.tasks[selected_index]["completed"]:
-                    popup_menu.add_command(label="Mark as Incomplete", command=self.mark_complete)
+                if all(task["completed"] for task in tasks):
+                    popup_menu.add_command(label=f"Mark {count} as Incomplete", command=self.mark_complete)
                 else:
-                    popup_menu.add_command(label="Mark as Complete", command=self.mark_complete)
+                    popup_menu.add_command(label=f"Mark {count} as Complete", command=self.mark_complete)
                 
                 popup_menu.add_separator()
                 
@@ -342,22 +729,24 @@ class TodoApp:
                 for priority in ["High", "Medium", "Low"]:
                     priority_menu.add_command(
                         label=priority,
-                        command=lambda p=priority: self.change_priority(selected_index, p)
+                        command=lambda p=priority: self.change_priority(p)
                     )
                 popup_menu.add_cascade(label="Set Priority", menu=priority_menu)
                 
                 popup_menu.add_separator()
-                popup_menu.add_command(label="Delete Task", command=self.delete_task)
+                popup_menu.add_command(label=f"Delete {count}", command=self.delete_task)
                 
                 # Display menu
                 popup_menu.tk_popup(event.x_root, event.y_root)
         except tk.TclError:
             pass
     
-    def change_priority(self, index, priority):
-        self.tasks[index]["priority"] = priority
-        self.update_listbox()
-        self.save_tasks()
+    def change_priority(self, priority):
+        tasks = self.selected_tasks()
+        self.change_tasks(
+            [task for task in tasks if task["priority"] != priority],
+            lambda task: self.store.update(task, priority=priority)
+        )
     
     def add_task(self):
         task = self.task_entry.get().strip()
@@ -368,14 +757,8 @@ class TodoApp:
         priority = self.priority_var.get()
         
         if task:
-            self.tasks.append({
-                "task": task, 
-                "completed": False,
-                "priority": priority,
-                "date_added": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-            self.update_listbox()
-            self.save_tasks()
+            self.store.add(task, priority)
+            self.update_status()
             self.task_entry.delete(0, tk.END)
             self.task_entry.insert(0, "Add a new task...")
             self.task_entry.config(fg="#999999")
@@ -383,19 +766,25 @@ class TodoApp:
             messagebox.showwarning("Warning", "Please enter a task!")
     
     def mark_complete(self):
-        try:
-            selected_index = self.task_listbox.curselection()[0]
-            self.tasks[selected_index]["completed"] = not self.tasks[selected_index]["completed"]
-            self.update_listbox()
-            self.save_tasks()
-        except IndexError:
+        tasks = self.selected_tasks()
+        if not tasks:
             messagebox.showwarning("Warning", "Please select a task!")
+            return
+        # Complete them all, unless they all are already: then reopen them
+        completed = not all(task["completed"] for task in tasks)
+        self.change_tasks(
+            [task for task in tasks if task["completed"] != completed],
+            lambda task: self.store.set_completed(task, completed)
+        )
     
     def edit_task(self):
+        if len(self.task_listbox.curselection()) > 1:
+            messagebox.showwarning("Warning", "Please select a single task to edit!")
+            return
         try:
-            selected_index = self.task_listbox.curselection()[0]
-            current_task = self.tasks[selected_index]["task"]
-            current_priority = self.tasks[selected_index]["priority"]
+            task = self.selected_task()
+            current_task = task["task"]
+            current_priority = task["priority"]
             
             # Create custom dialog with modern styling
             edit_window = tk.Toplevel(self.root)
@@ -474,10 +863,7 @@ class TodoApp:
                 new_priority = priority_var.get()
                 
                 if new_task:
-                    self.tasks[selected_index]["task"] = new_task
-                    self.tasks[selected_index]["priority"] = new_priority
-                    self.update_listbox()
-                    self.save_tasks()
+                    self.update_task(task, task=new_task, priority=new_priority)
                     edit_window.destroy()
                 else:
                     messagebox.showwarning("Warning", "Task cannot be empty!")
@@ -517,134 +903,183 @@ class TodoApp:
             messagebox.showwarning("Warning", "Please select a task!")
     
     def delete_task(self):
-        try:
-            selected_index = self.task_listbox.curselection()[0]
-            task_to_delete = self.tasks[selected_index]["task"]
-            
-            confirm = messagebox.askyesno(
-                "Confirm Deletion", 
-                f"Are you sure you want to delete the task:\n\n{task_to_delete}?",
-                icon="warning"
-            )
-            
-            if confirm:
-                del self.tasks[selected_index]
-                self.update_listbox()
-                self.save_tasks()
-        except IndexError:
+        tasks = self.selected_tasks()
+        if not tasks:
             messagebox.showwarning("Warning", "Please select a task!")
+            return
+        
+        if len(tasks) == 1:
+            message = f"Are you sure you want to delete the task:\n\n{tasks[0]['task']}?"
+        else:
+            message = f"Are you sure you want to delete these {len(tasks)} tasks?"
+        confirm = messagebox.askyesno("Confirm Deletion", message, icon="warning")
+        
+        if confirm:
+            self.change_tasks(tasks, self.store.delete)
     
     def clear_all(self):
-        if not self.tasks:
+        self.store.ensure_loaded()
+        if not self.store.tasks:
             messagebox.showinfo("Info", "No tasks to clear.")
             return
             
         confirmed = messagebox.askyesno(
             "Confirmation", 
-            f"Are you sure you want to delete all {len(self.tasks)} tasks?",
+            f"Are you sure you want to delete all {len(self.store)} tasks?",
             icon="warning"
         )
         if confirmed:
-            self.tasks = []
-            self.update_listbox()
-            self.save_tasks()
+            self.store.clear()
+            self.update_status()
+    
+    def undo(self):
+        if not self.store.undo():
+            self.root.bell()
+        self.update_status()
+    
+    def redo(self):
+        if not self.store.redo():
+            self.root.bell()
+        self.update_status()
+    
+    def import_tasks(self):
+        path = filedialog.askopenfilename(title="Import Tasks", filetypes=RECORD_FILE_TYPES)
+        if not path:
+            return
+        try:
+            # Records are read one at a time and added in one batch, with one save
+            count = self.store.import_tasks(read_records(path))
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not import tasks: {e}\n\nNo tasks were added.")
+            return
+        self.update_status()
+        messagebox.showinfo("Import Tasks", f"Imported {count} task{'' if count == 1 else 's'}.")
+    
+    def export_tasks(self):
+        path = filedialog.asksaveasfilename(
+            title="Export Tasks",
+            filetypes=RECORD_FILE_TYPES,
+            defaultextension=".csv"
+        )
+        if not path:
+            return
+        self.store.ensure_loaded()
+        try:
+            count = write_records(path, self.store.tasks.values())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not export tasks: {e}")
+            return
+        messagebox.showinfo("Export Tasks", f"Exported {count} task{'' if count == 1 else 's'}.")
+    
+    def selected_task(self):
+        """Return the task on the first selected row; raises IndexError if none is selected"""
+        return self.store.visible[self.task_listbox.curselection()[0]]
+    
+    def selected_tasks(self):
+        return [self.store.visible[row] for row in self.task_listbox.curselection()]
+    
+    def select_tasks(self, task_ids):
+        """Select the rows of these tasks that are shown, replacing the selection"""
+        self.task_listbox.selection_clear(0, tk.END)
+        rows = [row for row in map(self.store.row_of, task_ids) if row is not None]
+        for row in rows:
+            self.task_listbox.selection_set(row)
+        return rows
+    
+    def format_task(self, task):
+        # Add priority indicator
+        task_text = f"{self.priority_icons.get(task.get('priority', 'Medium'), '● ')}{task['task']}"
+        if task["completed"]:
+            task_text = f"{self.completed_icon}{task_text}"
+        return task_text
+    
+    def describe_task(self, task):
+        """Return the text and color style for a task's row"""
+        if task["completed"]:
+            # Gray out completed tasks
+            return self.format_task(task), "completed"
+        # Color according to priority
+        priority = task.get("priority", "Medium")
+        return self.format_task(task), priority if priority in self.priority_colors else "default"
+    
+    def update_task(self, task, /, **changes):
+        """Change a task's fields (None removes a field), keeping it selected"""
+        self.change_tasks([task], lambda task: self.store.update(task, **changes))
+    
+    def change_tasks(self, tasks, change):
+        """Apply change(task) to each task as one batch, keeping the selection
+        
+        However many tasks there are, that's one list refresh, one save and
+        one undo step.
+        """
+        selected_ids = [task["id"] for task in self.selected_tasks()]
+        with self.store.batch(len(tasks)):
+            for task in tasks:
+                change(task)
+        self.select_tasks(selected_ids)
+        self.update_status()
     
     def update_listbox(self):
-        self.task_listbox.delete(0, tk.END)
-        
-        # Get the current filter
-        current_filter = self.filter_var.get()
-        
-        # Filter tasks according to the selected filter
-        filtered_tasks = []
-        for task in self.tasks:
-            if current_filter == "All":
-                filtered_tasks.append(task)
-            elif current_filter == "Active" and not task["completed"]:
-                filtered_tasks.append(task)
-            elif current_filter == "Completed" and task["completed"]:
-                filtered_tasks.append(task)
-            elif current_filter == "High Priority" and task["priority"] == "High":
-                filtered_tasks.append(task)
-        
-        # Sort tasks by priority (High > Medium > Low) and completion status
-        priority_order = {"High": 0, "Medium": 1, "Low": 2}
-        sorted_tasks = sorted(filtered_tasks, 
-                             key=lambda x: (x["completed"], 
-                                           priority_order.get(x.get("priority", "Medium"), 1)))
-        
-        # Display tasks in the listbox
-        for task in sorted_tasks:
-            task_text = task["task"]
-            priority = task.get("priority", "Medium")
-            
-            # Add priority icon and completion status
-            if task["completed"]:
-                prefix = self.completed_icon
-            else:
-                prefix = self.uncompleted_icon
-                
-            # Add priority indicator
-            priority_prefix = self.priority_icons.get(priority, "● ")
-            
-            # Combine all prefixes
-            final_prefix = f"{priority_prefix}"
-            
-            # Format the task display
-            task_text = f"{final_prefix}{task_text}"
-            if task["completed"]:
-                task_text = f"✓ {task_text}"
-            
-            self.task_listbox.insert(tk.END, task_text)
-            
-            # Color the task based on priority and completion
-            last_index = self.task_listbox.size() - 1
-            
-            if task["completed"]:
-                # Gray out completed tasks
-                self.task_listbox.itemconfig(
-                    last_index,
-                    fg="#999999",
-                    bg="#f9f9f9"
-                )
-            else:
-                # Color according to priority
-                self.task_listbox.itemconfig(
-                    last_index,
-                    bg=self.priority_colors.get(priority, self.bg_color)
-                )
+        """Show the rows of the current filter and search"""
+        selected_ids = [task["id"] for task in self.selected_tasks()]
+        
+        self.store.set_view(self.filter_var.get(), self.search_var.get())
+        self.task_listbox.reset()
         
-        # Update status bar
-        completed_count = sum(1 for task in self.tasks if task["completed"])
-        active_count = len(self.tasks) - completed_count
-        high_priority_count = sum(1 for task in self.tasks if task.get("priority") == "High" and not task["completed"])
+        # Keep the selected tasks selected if they are still shown
+        rows = self.select_tasks(selected_ids)
+        if rows:
+            self.task_listbox.see(rows[0])
+        self.update_status()
+    
+    def update_status(self):
+        # Read from the store's maintained counters; no pass over the tasks
+        summary = self.store.summary()
+        active = summary["active_by_priority"]
         
         self.status_var.set(
-            f"Total: {len(self.tasks)} | "
-            f"Active: {active_count} | "
-            f"Completed: {completed_count} | "
-            f"High Priority: {high_priority_count}"
+            f"Total: {summary['total']} | "
+            f"Active: {summary['active']} | "
+            f"Completed: {summary['completed']} (Today: {summary['completed_today']}) | "
+            f"High Priority: {active['High']} | "
+            f"Medium: {active['Medium']} | "
+            f"Low: {active['Low']}"
+            + (" | Loading..." if self.store.loading is not None else "")
         )
     
-    def save_tasks(self):
-        with open("tasks.json", "w") as f:
-            json.dump(self.tasks, f, indent=2)
+    def show_save_error(self, error):
+        messagebox.showerror("Error", f"Could not save tasks: {error}")
     
-    def load_tasks(self):
-        try:
-            with open("tasks.json", "r") as f:
-                self.tasks = json.load(f)
-                
-                # Ensure all tasks have required fields
-                for task in self.tasks:
-                    if "priority" not in task:
-                        task["priority"] = "Medium"
-                    if "date_added" not in task:
-                        task["date_added"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        except FileNotFoundError:
-            self.tasks = []
+    def on_close(self):
+        error = self.store.flush()
+        if error is not None and not messagebox.askyesno(
+            "Error",
+            f"Could not save tasks: {error}\n\nClose anyway and lose the latest changes?",
+            icon="warning"
+        ):
+            return
+        self.store.close()
+        self.root.destroy()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="To-Do List Manager")
+    parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help=f"store tasks in {TASKS_DB} (imports {TASKS_FILE} on first use)"
+    )
+    parser.add_argument(
+        "--fast-start",
+        action="store_true",
+        help="show the window after loading the first screenful of tasks, and load the rest in the background"
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="print how long the window took to first appear (and, with --fast-start, to load every task)"
+    )
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = TodoApp(root)
+    app = TodoApp(root, use_sqlite=args.sqlite, fast_start=args.fast_start, timing=args.timing)
     root.mainloop() 
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Add, complete, delete and list tasks from the command line.
+
+Works on the same tasks.json (or tasks.db) as the app, so don't run both at
+once. Each run loads the tasks once, applies every change as one batch and
+saves once, so a file with a million lines takes one load and one save.
+
+Usage:
+    python todo_cli.py add "Buy milk" "Call Sam" --priority High
+    python todo_cli.py add --file new_tasks.txt     # one task per line, - for stdin
+    python todo_cli.py complete 12 15
+    python todo_cli.py delete --file done_ids.txt   # one id per line
+    python todo_cli.py list --filter Active --search milk
+    python todo_cli.py import old_tasks.csv         # CSV or JSON Lines, by extension
+    python todo_cli.py export backup.jsonl
+
+With SQLite storage, import and export stream records straight to and from
+the database without loading the task list, so memory use stays flat for
+files of any size.
+"""
+import argparse
+import json
+import sys
+
+from task_store import (
+    FILTER_RANGES, PRIORITY_ORDER, TASKS_DB, TASKS_FILE, SqliteTaskStorage, TaskStore, read_records, write_records
+)
+
+
+def read_lines(path):
+    """Yield the non-blank lines of a file, or of stdin for "-", without the newline"""
+    file = sys.stdin if path == "-" else open(path, "r")
+    try:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def read_ids(args):
+    """Collect the task ids given as arguments and in --file, checking them before any change"""
+    ids = []
+    values = list(args.ids)
+    if args.file:
+        values.extend(read_lines(args.file))
+    for value in values:
+        try:
+            ids.append(int(value))
+        except ValueError:
+            raise SystemExit(f"Error: not a task id: {value!r}")
+    return ids
+
+
+def add_tasks(store, args):
+    added = 0
+    with store.batch():
+        for text in args.texts:
+            store.add(text, args.priority)
+            added += 1
+        if args.file:
+            for text in read_lines(args.file):
+                store.add(text, args.priority)
+                added += 1
+    print(f"Added {added} task{'' if added == 1 else 's'}", file=sys.stderr)
+    return 0
+
+
+def change_tasks(store, args, change, verb):
+    """Apply change(task) to every task id given; unknown ids are reported and skipped"""
+    ids = read_ids(args)
+    missing = []
+    changed = 0
+    with store.batch():
+        for task_id in ids:
+            task = store.tasks.get(task_id)
+            if task is None:
+                missing.append(task_id)
+            elif change(task) is not False:
+                changed += 1
+    print(f"{verb} {changed} task{'' if changed == 1 else 's'}", file=sys.stderr)
+    if missing:
+        shown = ", ".join(str(task_id) for task_id in missing[:10])
+        more = f" and {len(missing) - 10} more" if len(missing) > 10 else ""
+        print(f"No task with id {shown}{more}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def complete_tasks(store, args):
+    def complete(task):
+        if task["completed"]:
+            return False
+        store.set_completed(task)
+    return change_tasks(store, args, complete, "Completed")
+
+
+def delete_tasks(store, args):
+    return change_tasks(store, args, store.delete, "Deleted")
+
+
+def list_tasks(store, args):
+    store.set_view(args.filter, args.search)
+    if args.json:
+        lines = (json.dumps(task) + "\n" for task in store.visible)
+    else:
+        lines = (
+            f"{task['id']:>7}  [{'x' if task['completed'] else ' '}] {task['priority']:<6}  {task['task']}\n"
+            for task in store.visible
+        )
+    sys.stdout.writelines(lines)
+    return 0
+
+
+def import_tasks(store, args):
+    try:
+        if isinstance(store.storage, SqliteTaskStorage):
+            added = store.storage.append_tasks(read_records(args.file, args.format))
+        else:
+            store.load()
+            added = store.import_tasks(read_records(args.file, args.format))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Imported {added} task{'' if added == 1 else 's'}", file=sys.stderr)
+    return 0
+
+
+def export_tasks(store, args):
+    if isinstance(store.storage, SqliteTaskStorage):
+        tasks = store.storage.rows()
+    else:
+        store.load()
+        tasks = store.tasks.values()
+    try:
+        written = write_records(args.file, tasks, args.format)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Exported {written} task{'' if written == 1 else 's'}", file=sys.stderr)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the to-do list from the command line.")
+    parser.add_argument("--sqlite", action="store_true", help=f"store tasks in {TASKS_DB} (imports {TASKS_FILE} on first use)")
+    parser.add_argument("--tasks-file", default=TASKS_FILE, help="JSON task file")
+    parser.add_argument("--db", default=TASKS_DB, help="SQLite task database, used instead of the JSON file once it exists")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add tasks")
+    add.add_argument("texts", nargs="*", metavar="TEXT", help="task text")
+    add.add_argument("--file", help="file with one task per line (- for stdin)")
+    add.add_argument("--priority", choices=list(PRIORITY_ORDER), default="Medium")
+    add.set_defaults(run=add_tasks)
+
+    for name, run, help_text in (
+        ("complete", complete_tasks, "mark tasks as completed"),
+        ("delete", delete_tasks, "delete tasks"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("ids", nargs="*", metavar="ID", help="task id")
+        command.add_argument("--file", help="file with one task id per line (- for stdin)")
+        command.set_defaults(run=run)
+
+    list_command = commands.add_parser("list", help="print tasks in display order")
+    list_command.add_argument("--filter", choices=list(FILTER_RANGES), default="All")
+    list_command.add_argument("--search", default="", help="only tasks with words starting with each of these")
+    list_command.add_argument("--json", action="store_true", help="print one JSON task per line")
+    list_command.set_defaults(run=list_tasks)
+
+    # These load the task list themselves, only when they need it
+    for name, run, help_text in (
+        ("import", import_tasks, "add the tasks in a CSV or JSON Lines file"),
+        ("export", export_tasks, "write every task to a CSV or JSON Lines file"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("file", help="a .csv or .jsonl file")
+        command.add_argument("--format", choices=["csv", "jsonl"], help="file format, if not given by the extension")
+        command.set_defaults(run=run, loads=False)
+
+    args = parser.parse_args()
+
+    # Nothing can be undone after the command exits, so keep no undo steps
+    store = TaskStore(args.sqlite, path=args.tasks_file, db_path=args.db, undo_limit=0)
+    if getattr(args, "loads", True):
+        store.load()
+    status = args.run(store, args)
+    error = store.flush()
+    store.close()
+    if error is not None:
+        print(f"Error: could not save tasks: {error}", file=sys.stderr)
+        return 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,167 @@
-import random
-import string
-import json
 import os
+import atexit
+import threading
+from functools import wraps
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from breach import BreachFilterError, get_checker
+from description_index import DescriptionIndex
+from markov import generate_pronounceable
+from password_core import generate_password
+from password_store import PasswordStore
+from rate_limit import ConcurrencyGate, ShardedCounter, TokenBucketLimiter
+from reuse_index import ReuseIndex, load_install_key
+from strength import estimate_strength, estimate_batch
+from vault import VAULT_FILE, SessionKeys, Vault, VaultError, decrypt_password, encrypt_entry, fingerprint_password
 
 app = Flask(__name__)
 
+# Signs the session cookie that carries the vault token
+app.secret_key = os.environ.get('SECRET_KEY') or os.urandom(32)
+
 # Path to the JSON file
 PASSWORDS_FILE = "saved_passwords.json"
 
-def generate_password(length, use_lowercase=True, use_uppercase=True, use_numbers=True, use_special=True):
-    """Generate a random password based on specified criteria."""
-    # Define character sets
-    lowercase_chars = string.ascii_lowercase if use_lowercase else ""
-    uppercase_chars = string.ascii_uppercase if use_uppercase else ""
-    number_chars = string.digits if use_numbers else ""
-    special_chars = string.punctuation if use_special else ""
-    
-    # Combine all enabled character sets
-    all_chars = lowercase_chars + uppercase_chars + number_chars + special_chars
+# Per-install secret used to fingerprint passwords in the reuse index
+INSTALL_KEY_FILE = "install.key"
+
+# Maximum number of passwords, and of characters in all of them, scored by
+# one /strength/batch request
+MAX_BATCH_SIZE = 10000
+MAX_BATCH_CHARACTERS = 500000
+
+# How many times /generate retries when a password is found in the breach corpus
+MAX_GENERATE_ATTEMPTS = 10
+
+# Saved passwords: JSON snapshot plus an append-only log written in the background
+store = PasswordStore(PASSWORDS_FILE)
+atexit.register(store.close)
+
+# Built from the store on first use, then kept up to date by save_password
+reuse_index = None
+description_index = None
+index_lock = threading.Lock()
+
+# Encrypted vault settings, loaded on first use; None when the vault is off
+vault = None
+vault_loaded = False
+
+# Derived vault keys for unlocked browser sessions
+session_keys = SessionKeys()
+
+# Per-client rate limits (requests per second, burst) for the write-heavy endpoints
+generate_limiter = TokenBucketLimiter(rate=10, burst=20)
+save_limiter = TokenBucketLimiter(rate=2, burst=10)
+
+# Strength scoring: single passwords (checked as the user types), and the
+# much heavier batch and saved-password audits
+strength_limiter = TokenBucketLimiter(rate=10, burst=20)
+audit_limiter = TokenBucketLimiter(rate=0.5, burst=5)
+
+# Vault unlocks run scrypt (about 50ms and 16MB each) on a guessable
+# passphrase: a few tries, then one every 5 seconds
+unlock_limiter = TokenBucketLimiter(rate=0.2, burst=5)
+
+# Requests handled at once by the limited endpoints; the rest get 503
+request_gate = ConcurrencyGate(8)
+
+# Admitted and shed request counts per endpoint, reported by /stats/limits
+admission_counters = {}
+
+# Saved passwords page size (default and upper limit)
+PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+def load_passwords():
+    """Return all saved passwords from the in-memory view of the store"""
+    return store.entries()
+
+def load_indexes():
+    """Build the reuse and description indexes from the store on first use"""
+    global reuse_index, description_index
     
-    # Ensure at least one character set is selected
-    if not all_chars:
-        return None
+    with index_lock:
+        if reuse_index is None:
+            reuse = ReuseIndex(load_install_key(INSTALL_KEY_FILE))
+            descriptions = DescriptionIndex()
+            for entry_id, item in enumerate(store.entries()):
+                if "fingerprint" in item:
+                    reuse.add_fingerprint(bytes.fromhex(item["fingerprint"]), entry_id)
+                else:
+                    reuse.add(item["password"], entry_id)
+                descriptions.add(entry_id, item)
+            reuse_index, description_index = reuse, descriptions
+
+def get_reuse_index():
+    """Return the password reuse index"""
+    load_indexes()
+    return reuse_index
+
+def get_description_index():
+    """Return the description search and sort index"""
+    load_indexes()
+    return description_index
+
+def get_vault():
+    """Return the encrypted vault settings, or None if the vault is not enabled"""
+    global vault, vault_loaded
     
-    # Generate password
-    password = "".join(random.choice(all_chars) for _ in range(length))
+    if not vault_loaded:
+        vault = Vault.load(VAULT_FILE)
+        vault_loaded = True
+    return vault
+
+def breach_checker():
+    """Return the breach checker, or None if no filter has been built
     
-    return password
+    A filter that can't be opened is logged and raised as BreachFilterError
+    on every request, rather than turning the check off.
+    """
+    try:
+        return get_checker()
+    except BreachFilterError as e:
+        app.logger.error("%s", e)
+        raise
 
-def load_passwords():
-    """Load saved passwords from JSON file"""
-    if os.path.exists(PASSWORDS_FILE):
-        with open(PASSWORDS_FILE, 'r') as file:
-            try:
-                return json.load(file)
-            except json.JSONDecodeError:
-                return []
-    return []
+def vault_key():
+    """Return the vault key cached for this session, or None if it is locked"""
+    return session_keys.get(session.get('vault_token'))
 
-def save_password(password, description=""):
-    """Save a password to the JSON file"""
-    passwords = load_passwords()
+def entry_password(item, key):
+    """Return the password of a saved entry, decrypting it in vault mode"""
+    if "ciphertext" in item:
+        return decrypt_password(key, item)
+    return item["password"]
+
+def describe_entries(entry_ids):
+    """Summarise saved entries without including their passwords"""
+    entries = []
+    for entry_id in entry_ids:
+        item = store.get(entry_id)
+        entries.append({
+            "id": entry_id,
+            "description": item.get("description", ""),
+            "created_at": item.get("created_at"),
+        })
+    return entries
+
+def password_fingerprint(password, key=None):
+    """Return the reuse-index fingerprint of a password
+    
+    Vault passwords are fingerprinted with a key derived from the vault key
+    instead of install.key, so their stored fingerprints can't be used to
+    check guesses without the passphrase.
+    """
+    if key is not None:
+        return fingerprint_password(key, password)
+    return get_reuse_index().fingerprint(password)
+
+def save_password(password, description="", key=None, fingerprint=None):
+    """Append a password to the saved password log and return its id
     
+    With a vault key the password is encrypted before it is written. A
+    caller that already has the password's fingerprint can pass it in.
+    """
     # Create new password entry
     new_entry = {
         "password": password,
@@ -51,13 +169,49 @@ def save_password(password, description=""):
         "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
     
-    # Add to list and save
-    passwords.append(new_entry)
+    if fingerprint is None:
+        fingerprint = password_fingerprint(password, key)
+    if key is not None:
+        new_entry = encrypt_entry(key, new_entry, fingerprint)
     
-    with open(PASSWORDS_FILE, 'w') as file:
-        json.dump(passwords, file, indent=4)
+    # Blocks until the background writer has committed the entry
+    entry_id = store.append(new_entry)
+    get_reuse_index().add_fingerprint(fingerprint, entry_id)
+    get_description_index().add(entry_id, new_entry)
     
-    return True
+    return entry_id
+
+def admission_control(limiter):
+    """Rate limit a view per client and shed load when too many are running"""
+    def decorator(view):
+        counters = admission_counters[view.__name__] = {
+            "admitted": ShardedCounter(),
+            "rate_limited": ShardedCounter(),
+            "overloaded": ShardedCounter(),
+        }
+        
+        @wraps(view)
+        def limited_view(*args, **kwargs):
+            if not limiter.allow(request.remote_addr):
+                counters["rate_limited"].increment()
+                response = jsonify({"error": "Too many requests. Please slow down"})
+                response.headers["Retry-After"] = str(limiter.retry_after())
+                return response, 429
+            
+            if not request_gate.try_enter():
+                counters["overloaded"].increment()
+                response = jsonify({"error": "Server is busy. Please try again"})
+                response.headers["Retry-After"] = "1"
+                return response, 503
+            
+            counters["admitted"].increment()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                request_gate.exit()
+        
+        return limited_view
+    return decorator
 
 @app.route('/')
 def index():
@@ -65,28 +219,52 @@ def index():
     return render_template('index.html')
 
 @app.route('/generate', methods=['POST'])
+@admission_control(generate_limiter)
 def generate():
     """Generate a password based on form inputs"""
     try:
         # Get parameters from form
         length = int(request.form.get('length', 12))
+        mode = request.form.get('mode', 'random')
         use_lowercase = 'lowercase' in request.form
         use_uppercase = 'uppercase' in request.form
         use_numbers = 'numbers' in request.form
         use_special = 'special' in request.form
         
+        def new_password():
+            """Return (password, entropy in bits or None) for the selected mode"""
+            if mode == 'pronounceable':
+                return generate_pronounceable(length)
+            return generate_password(length, use_lowercase, use_uppercase, use_numbers, use_special), None
+        
         # Generate password
-        password = generate_password(length, use_lowercase, use_uppercase, use_numbers, use_special)
+        password, entropy = new_password()
         
         if not password:
             return jsonify({"error": "Please select at least one character type"}), 400
         
-        return jsonify({"password": password})
+        # Silently replace passwords found in the local breach corpus
+        checker = breach_checker()
+        if checker:
+            attempts = 1
+            while checker.is_breached(password):
+                if attempts >= MAX_GENERATE_ATTEMPTS:
+                    return jsonify({"error": "Could not generate a password that is not known to be breached. Try a longer length or more character types"}), 400
+                password, entropy = new_password()
+                attempts += 1
+        
+        response = {"password": password}
+        if entropy is not None:
+            response["entropy_bits"] = round(entropy, 1)
+        return jsonify(response)
     
+    except BreachFilterError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 @app.route('/save', methods=['POST'])
+@admission_control(save_limiter)
 def save():
     """Save a password to JSON file"""
     try:
@@ -97,17 +275,213 @@ def save():
         if not password:
             return jsonify({"error": "No password provided"}), 400
         
-        save_password(password, description)
-        return jsonify({"success": True})
+        key = None
+        if get_vault():
+            key = vault_key()
+            if key is None:
+                return jsonify({"error": "Vault is locked. Unlock it on the Saved Passwords page"}), 403
+        
+        fingerprint = password_fingerprint(password, key)
+        entry_id = save_password(password, description, key, fingerprint)
+        
+        # Earlier entries that already use this password
+        reused_ids = [other for other in get_reuse_index().find_fingerprint(fingerprint) if other != entry_id]
+        
+        response = {"success": True, "reused_with": describe_entries(reused_ids)}
+        try:
+            checker = breach_checker()
+        except BreachFilterError as e:
+            # The password is saved; report why it wasn't checked
+            response["breach_error"] = str(e)
+        else:
+            if checker:
+                response["breached"] = checker.is_breached(password)
+        return jsonify(response)
     
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route('/breach', methods=['POST'])
+def breach():
+    """Check a password against the local breach corpus"""
+    try:
+        data = request.get_json()
+        password = data.get('password')
+        
+        if not password:
+            return jsonify({"error": "No password provided"}), 400
+        
+        checker = breach_checker()
+        if not checker:
+            return jsonify({"error": "No breach filter installed. Run build_breach_filter.py first"}), 404
+        
+        return jsonify({"breached": checker.is_breached(password)})
+    
+    except BreachFilterError as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/strength', methods=['POST'])
+@admission_control(strength_limiter)
+def strength():
+    """Estimate the strength of a single password"""
+    try:
+        data = request.get_json()
+        password = data.get('password')
+        
+        if not password:
+            return jsonify({"error": "No password provided"}), 400
+        
+        return jsonify(estimate_strength(password))
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/strength/batch', methods=['POST'])
+@admission_control(audit_limiter)
+def strength_batch():
+    """Estimate the strength of a list of passwords"""
+    try:
+        data = request.get_json()
+        passwords = data.get('passwords')
+        details = bool(data.get('details', False))
+        
+        if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+            return jsonify({"error": "Expected a list of passwords"}), 400
+        if len(passwords) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"At most {MAX_BATCH_SIZE} passwords per request"}), 400
+        if sum(len(p) for p in passwords) > MAX_BATCH_CHARACTERS:
+            return jsonify({"error": f"At most {MAX_BATCH_CHARACTERS} characters of passwords per request"}), 400
+        
+        return jsonify({"results": estimate_batch(passwords, details)})
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/strength/saved')
+@admission_control(audit_limiter)
+def strength_saved():
+    """Audit the strength of every saved password"""
+    passwords = load_passwords()
+    key = None
+    if get_vault():
+        key = vault_key()
+        if key is None:
+            return jsonify({"error": "Vault is locked. Unlock it on the Saved Passwords page"}), 403
+    results = estimate_batch([entry_password(item, key) for item in passwords])
+    
+    # Report descriptions and scores only, never the passwords themselves
+    audit = []
+    summary = {label: 0 for label in ("Weak", "Moderate", "Strong")}
+    for item, result in zip(passwords, results):
+        audit.append({
+            "description": item.get("description", ""),
+            "created_at": item.get("created_at"),
+            "score": result["score"],
+            "label": result["label"],
+        })
+        summary[result["label"]] += 1
+    
+    return jsonify({"total": len(audit), "summary": summary, "results": audit})
+
+@app.route('/stats/limits')
+def limit_stats():
+    """Report admitted and shed request counts for the rate-limited endpoints"""
+    return jsonify({
+        endpoint: {name: counter.value for name, counter in counters.items()}
+        for endpoint, counters in admission_counters.items()
+    })
+
+@app.route('/passwords/reuse')
+def password_reuse():
+    """Report every password that has been saved more than once"""
+    groups = [describe_entries(sorted(ids)) for ids in get_reuse_index().reused_groups()]
+    groups.sort(key=lambda group: -len(group))
+    return jsonify({"total_groups": len(groups), "groups": groups})
+
+@app.route('/vault/unlock', methods=['POST'])
+@admission_control(unlock_limiter)
+def unlock_vault():
+    """Derive the vault key from a passphrase and cache it for this session"""
+    current = get_vault()
+    if not current:
+        return jsonify({"error": "The vault is not enabled. Run encrypt_vault.py first"}), 404
+    
+    data = request.get_json(silent=True) or {}
+    passphrase = data.get('passphrase') if isinstance(data, dict) else None
+    if not passphrase or not isinstance(passphrase, str):
+        return jsonify({"error": "No passphrase provided"}), 400
+    
+    try:
+        key = current.unlock(passphrase)
+    except VaultError as e:
+        return jsonify({"error": str(e)}), 403
+    
+    session_keys.remove(session.get('vault_token'))
+    session['vault_token'] = session_keys.add(key)
+    return jsonify({"success": True})
+
+@app.route('/vault/lock', methods=['POST'])
+def lock_vault():
+    """Forget this session's vault key"""
+    session_keys.remove(session.pop('vault_token', None))
+    return jsonify({"success": True})
+
+@app.route('/passwords/<int:entry_id>/reveal', methods=['POST'])
+def reveal_password(entry_id):
+    """Return one saved password, decrypting only that record"""
+    item = store.get(entry_id)
+    if item is None:
+        return jsonify({"error": "No such password"}), 404
+    
+    key = None
+    if "ciphertext" in item:
+        key = vault_key()
+        if key is None:
+            return jsonify({"error": "Vault is locked. Unlock it on the Saved Passwords page"}), 403
+    
+    try:
+        return jsonify({"password": entry_password(item, key)})
+    except VaultError as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/passwords')
 def view_passwords():
-    """View all saved passwords"""
-    passwords = load_passwords()
-    return render_template('passwords.html', passwords=passwords)
+    """View saved passwords, one page at a time"""
+    query = request.args.get('q', '').strip()
+    sort = 'oldest' if request.args.get('sort') == 'oldest' else 'newest'
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', PER_PAGE)), 1), MAX_PER_PAGE)
+    except ValueError:
+        page, per_page = 1, PER_PAGE
+    
+    # Look up just the ids on this page, then load only those entries
+    entry_ids, total = get_description_index().page(query, sort == 'newest', (page - 1) * per_page, per_page)
+    # Passwords are left out of the page and fetched one at a time through /reveal
+    passwords = []
+    for entry_id in entry_ids:
+        item = store.get(entry_id)
+        passwords.append({
+            "id": entry_id,
+            "description": item.get("description", ""),
+            "created_at": item.get("created_at"),
+        })
+    
+    total_pages = max((total + per_page - 1) // per_page, 1)
+    return render_template(
+        'passwords.html',
+        passwords=passwords,
+        query=query,
+        sort=sort,
+        page=page,
+        per_page=per_page,
+        total=total,
+        total_pages=total_pages,
+        vault_enabled=get_vault() is not None,
+        vault_unlocked=vault_key() is not None
+    )
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,259 @@
+"""
+Benchmarks for the password generator's hot paths.
+
+Covers generate_password in all three modules, saving and loading with
+1k/100k/1M saved entries, the /generate and /save endpoints through the
+Flask test client, and interpreter start-up time for the CLIs and the web
+app. Results are written as JSON so runs can be compared.
+
+Usage:
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+    python benchmark.py --quick
+    python benchmark.py --suite startup
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from seeded_generator import SeededPasswordGenerator
+
+LENGTHS = [8, 16, 64]
+CHARSETS = {
+    "all": (True, True, True, True),
+    "letters": (True, True, False, False),
+    "digits": (False, False, True, False),
+}
+STORE_SIZES = [1000, 100000, 1000000]
+SUITES = ["generate", "store", "endpoints", "startup"]
+
+# Start-up is timed as a fresh interpreter running each statement
+STARTUP_STATEMENTS = {
+    "interpreter": "pass",
+    "password_core": "import password_core",
+    "password_generator": "import password_generator",
+    "simple_password_generator": "import simple_password_generator",
+    "app": "import app",
+}
+QUICK_STORE_SIZES = [1000, 100000]
+
+
+def measure(func, number, repeat=5):
+    """Time `number` calls of func, `repeat` times, and return per-call stats."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        "calls": number * repeat,
+        "mean_s": statistics.mean(timings),
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings),
+    }
+
+
+def measure_once(func):
+    """Time a single call, for operations too slow to repeat."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return {"calls": 1, "mean_s": elapsed, "median_s": elapsed, "min_s": elapsed, "max_s": elapsed}
+
+
+def record(results, name, params, stats):
+    results.append({"name": name, "params": params, **stats})
+    label = " ".join(f"{key}={value}" for key, value in params.items())
+    print(f"{name:<44} {label:<36} {stats['median_s'] * 1e6:>12.2f} us")
+
+
+def bench_generate(results, quick):
+    import app
+    import password_generator
+    import simple_password_generator
+
+    number = 200 if quick else 2000
+    for length in LENGTHS:
+        for charset, flags in CHARSETS.items():
+            record(results, "app.generate_password", {"length": length, "charset": charset},
+                   measure(lambda: app.generate_password(length, *flags), number))
+            record(results, "password_generator.generate_password", {"length": length, "charset": charset},
+                   measure(lambda: password_generator.generate_password(length, *flags), number))
+        record(results, "simple_password_generator.generate_password", {"length": length, "charset": "all"},
+               measure(lambda: simple_password_generator.generate_password(length), number))
+
+
+def make_entries(count, seed):
+    """Saved entries with passwords that are identical on every run with the same seed."""
+    generator = SeededPasswordGenerator(seed).stream(f"entries-{count}")
+    return [
+        {
+            "password": generator.generate_password(12),
+            "description": f"account {i} example",
+            "created_at": f"2025-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}",
+        }
+        for i in range(count)
+    ]
+
+
+def use_store(size, work_dir, seed):
+    """Point the app at a fresh store holding `size` entries."""
+    import app
+    from password_store import PasswordStore
+
+    app.store.close()
+    snapshot = os.path.join(work_dir, f"saved_{size}.json")
+    with open(snapshot, "w") as file:
+        json.dump(make_entries(size, seed), file)
+    app.store = PasswordStore(snapshot)
+    app.reuse_index = None
+    app.description_index = None
+    return app.store
+
+
+def bench_store(results, quick, work_dir, seed):
+    import app
+    from password_store import PasswordStore
+
+    for size in QUICK_STORE_SIZES if quick else STORE_SIZES:
+        store = use_store(size, work_dir, seed)
+        repeat = 1 if size >= 1000000 else 3
+
+        # Cold load: parse the snapshot and replay the log
+        def cold_load():
+            PasswordStore(store.snapshot_file).entries()
+
+        record(results, "load_passwords.cold", {"entries": size}, measure(cold_load, 1, repeat))
+
+        store.entries()
+        record(results, "load_passwords.warm", {"entries": size}, measure(app.load_passwords, 10, repeat))
+
+        record(results, "indexes.build", {"entries": size}, measure_once(app.load_indexes))
+
+        record(results, "save_password", {"entries": size},
+               measure(lambda: app.save_password("benchmark-password", "benchmark"), 50 if quick else 200))
+
+
+def bench_endpoints(results, quick, work_dir, seed):
+    import app
+
+    use_store(1000, work_dir, seed)
+    client = app.app.test_client()
+
+    # Every request comes from one client; lift its rate limits so they aren't what gets measured
+    for limiter in (app.generate_limiter, app.save_limiter):
+        limiter.rate = limiter.burst = 1e9
+    number = 100 if quick else 1000
+
+    form = {"length": "16", "lowercase": "on", "uppercase": "on", "numbers": "on", "special": "on"}
+    record(results, "POST /generate", {"length": 16},
+           measure(lambda: client.post("/generate", data=form), number))
+
+    body = {"password": "Benchmark-Pw-123", "description": "benchmark"}
+    record(results, "POST /save", {"entries": 1000},
+           measure(lambda: client.post("/save", json=body), number // 5))
+
+
+def bench_startup(results, quick):
+    runs = 5 if quick else 20
+    for name, statement in STARTUP_STATEMENTS.items():
+        command = [sys.executable, "-c", statement]
+        record(results, "startup", {"module": name},
+               measure(lambda: subprocess.run(command, cwd=BASE_DIR, check=True), 1, runs))
+
+    # The CLIs must stay independent of the web app's dependencies
+    check = "import sys, password_generator, simple_password_generator; print('flask' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", check], cwd=BASE_DIR, check=True,
+                            capture_output=True, text=True).stdout.strip()
+    if output != "False":
+        print("WARNING: importing the command-line generators loads Flask")
+
+
+def compare(results, baseline_file):
+    """Print the change in median time against a previous run."""
+    with open(baseline_file, "r") as file:
+        baseline = json.load(file)
+
+    def key(result):
+        return result["name"], json.dumps(result["params"], sort_keys=True)
+
+    previous = {key(result): result for result in baseline["results"]}
+    print(f"\nCompared with {baseline_file} ({baseline['meta']['timestamp']}):")
+    for result in results:
+        old = previous.get(key(result))
+        if old is None or not old["median_s"]:
+            continue
+        change = (result["median_s"] - old["median_s"]) / old["median_s"] * 100
+        label = " ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(f"{result['name']:<44} {label:<36} {change:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark password generation and persistence.")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations and no 1M-entry store")
+    parser.add_argument("--suite", action="append", choices=SUITES,
+                        help="run only this suite (can be repeated; default: all)")
+    parser.add_argument("--seed", default="benchmark", help="seed for the generated fixtures (default: benchmark)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    suites = args.suite or SUITES
+
+    results = []
+    if "startup" in suites:
+        bench_startup(results, args.quick)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # The app writes its store and install key relative to the working directory
+        os.chdir(work_dir)
+        import app
+
+        if "generate" in suites:
+            bench_generate(results, args.quick)
+        if "store" in suites:
+            bench_store(results, args.quick, work_dir, args.seed)
+        if "endpoints" in suites:
+            bench_endpoints(results, args.quick, work_dir, args.seed)
+
+        app.store.close()
+        os.chdir(BASE_DIR)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+            "suites": suites,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    if output:
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nWrote {output}")
+
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
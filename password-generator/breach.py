@@ -0,0 +1,139 @@
+import bisect
+import hashlib
+import mmap
+import os
+import struct
+
+# Files written by build_breach_filter.py
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+BLOOM_FILE = os.path.join(DATA_DIR, "breached.bloom")
+HASHES_FILE = os.path.join(DATA_DIR, "breached.sha1")
+
+# Bloom filter header: magic, number of bits, number of hash functions
+BLOOM_MAGIC = b"PWBLOOM1"
+BLOOM_HEADER = struct.Struct("<8sQI")
+DIGEST_SIZE = 20
+
+_checker = None
+_checker_loaded = False
+
+
+class BreachFilterError(Exception):
+    """Raised when the breach filter files exist but can't be used."""
+
+
+def password_digest(password):
+    """SHA-1 digest of a password, the format breach corpora are published in."""
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+def bloom_positions(digest, num_bits, num_hashes):
+    """Bit positions for a digest, using double hashing over the SHA-1 bytes."""
+    h1 = int.from_bytes(digest[0:8], "little")
+    h2 = int.from_bytes(digest[8:16], "little") | 1
+    return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+
+class _SortedDigests:
+    """Read-only sequence view over a file of sorted fixed-size digests."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __len__(self):
+        return len(self.buffer) // DIGEST_SIZE
+
+    def __getitem__(self, index):
+        start = index * DIGEST_SIZE
+        return self.buffer[start:start + DIGEST_SIZE]
+
+
+class BreachChecker:
+    """
+    Offline check against a corpus of known-breached password hashes.
+
+    The Bloom filter is memory-mapped, so opening it costs nothing and only
+    the pages that lookups touch are read. A filter miss means the password
+    is definitely not in the corpus. A hit is confirmed with a binary search
+    of the sorted hash file when it is available, which rules out the
+    filter's false positives.
+    """
+
+    def __init__(self, bloom_file=BLOOM_FILE, hashes_file=HASHES_FILE):
+        self._files = []
+        self._maps = []
+        try:
+            self._open(bloom_file, hashes_file)
+        except BaseException:
+            self.close()
+            raise
+
+    def _open(self, bloom_file, hashes_file):
+        bloom_handle = open(bloom_file, "rb")
+        self._files.append(bloom_handle)
+        if os.fstat(bloom_handle.fileno()).st_size < BLOOM_HEADER.size:
+            raise ValueError(f"{bloom_file} is truncated")
+        self._bloom = mmap.mmap(bloom_handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(self._bloom)
+        magic, self.num_bits, self.num_hashes = BLOOM_HEADER.unpack_from(self._bloom, 0)
+        if magic != BLOOM_MAGIC:
+            raise ValueError(f"{bloom_file} is not a breach Bloom filter")
+        if len(self._bloom) != BLOOM_HEADER.size + (self.num_bits + 7) // 8 or not self.num_hashes:
+            raise ValueError(f"{bloom_file} is truncated or corrupt")
+
+        self._digests = None
+        if hashes_file and os.path.exists(hashes_file) and os.path.getsize(hashes_file) > 0:
+            hashes_handle = open(hashes_file, "rb")
+            self._files.append(hashes_handle)
+            if os.fstat(hashes_handle.fileno()).st_size % DIGEST_SIZE:
+                raise ValueError(f"{hashes_file} is truncated")
+            hashes = mmap.mmap(hashes_handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(hashes)
+            self._digests = _SortedDigests(hashes)
+
+    def might_contain(self, digest):
+        """Bloom filter lookup: False means definitely not breached."""
+        bloom = self._bloom
+        offset = BLOOM_HEADER.size
+        for position in bloom_positions(digest, self.num_bits, self.num_hashes):
+            if not bloom[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def contains(self, digest):
+        """Exact lookup in the sorted hash file."""
+        index = bisect.bisect_left(self._digests, digest)
+        return index < len(self._digests) and self._digests[index] == digest
+
+    def is_breached(self, password):
+        """Return True if the password appears in the breach corpus."""
+        digest = password_digest(password)
+        if not self.might_contain(digest):
+            return False
+        if self._digests is None:
+            return True
+        return self.contains(digest)
+
+    def close(self):
+        for buffer in self._maps:
+            buffer.close()
+        for handle in self._files:
+            handle.close()
+
+
+def get_checker():
+    """Return the shared BreachChecker, or None if no filter has been built.
+
+    Raises BreachFilterError if the filter can't be opened; the next call
+    tries again, so the check is never quietly skipped.
+    """
+    global _checker, _checker_loaded
+
+    if not _checker_loaded:
+        if os.path.exists(BLOOM_FILE):
+            try:
+                _checker = BreachChecker(BLOOM_FILE, HASHES_FILE)
+            except (OSError, ValueError) as e:
+                raise BreachFilterError(f"The breach filter could not be opened: {e}") from e
+        _checker_loaded = True
+    return _checker
@@ -0,0 +1,179 @@
+"""
+Build the offline breached-password filter from a list of hashes.
+
+The input has one entry per line, either a SHA-1 hex digest optionally
+followed by ":count" (the format published by Have I Been Pwned) or, with
+--plaintext, the passwords themselves. Two files are written:
+
+    breached.bloom  Bloom filter, memory-mapped by the web app
+    breached.sha1   Sorted raw SHA-1 digests used to confirm filter hits
+
+The input is never held in memory: it is sorted in chunks into temporary
+runs (input already sorted by hash, like the Have I Been Pwned download,
+makes a single run), the runs are merged into breached.sha1 dropping
+duplicates, and the filter, sized from that count, is filled from it.
+
+Usage:
+    python build_breach_filter.py pwned-passwords-sha1.txt
+    python build_breach_filter.py --plaintext data/passwords.txt
+"""
+import argparse
+import heapq
+import math
+import mmap
+import os
+import sys
+import tempfile
+from itertools import islice
+
+from breach import (BLOOM_FILE, BLOOM_HEADER, BLOOM_MAGIC, DIGEST_SIZE, HASHES_FILE,
+                    bloom_positions, password_digest)
+
+# Digests sorted in memory at a time (about 60 MB) before going to a run file
+SORT_CHUNK_DIGESTS = 1000000
+
+# Most run files merged at once, well under the usual open file limit
+MERGE_FAN_IN = 64
+
+# Digests read or written per file operation
+IO_BLOCK_DIGESTS = 4096
+
+
+def read_digests(path, plaintext=False):
+    """Yield the SHA-1 digest of every entry in the input file."""
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            if plaintext:
+                yield password_digest(line)
+                continue
+            hex_digest = line.split(":", 1)[0].strip()
+            try:
+                digest = bytes.fromhex(hex_digest)
+            except ValueError:
+                digest = b""
+            if len(digest) != 20:
+                print(f"Skipping line {line_number}: not a SHA-1 hash", file=sys.stderr)
+                continue
+            yield digest
+
+
+def sorted_runs(digests, directory):
+    """Sort the digests a chunk at a time into run files; return their paths.
+
+    A chunk that starts after the end of the previous run is appended to
+    it, so input that is already sorted ends up as a single run.
+    """
+    runs = []
+    last = None
+    while True:
+        chunk = list(islice(digests, SORT_CHUNK_DIGESTS))
+        if not chunk:
+            return runs
+        chunk.sort()
+        if last is None or chunk[0] < last:
+            runs.append(os.path.join(directory, f"run{len(runs)}"))
+        with open(runs[-1], "ab") as file:
+            file.write(b"".join(chunk))
+        last = chunk[-1]
+
+
+def read_run(path):
+    """Yield the digests of a run file in order."""
+    with open(path, "rb") as file:
+        while True:
+            block = file.read(DIGEST_SIZE * IO_BLOCK_DIGESTS)
+            if not block:
+                return
+            for start in range(0, len(block), DIGEST_SIZE):
+                yield block[start:start + DIGEST_SIZE]
+
+
+def merge_runs(runs, path):
+    """Merge sorted runs into one file, dropping duplicates; return how many digests were written."""
+    count = 0
+    previous = None
+    block = []
+    with open(path, "wb") as file:
+        for digest in heapq.merge(*(read_run(run) for run in runs)):
+            if digest == previous:
+                continue
+            previous = digest
+            block.append(digest)
+            if len(block) == IO_BLOCK_DIGESTS:
+                file.write(b"".join(block))
+                count += len(block)
+                block = []
+        file.write(b"".join(block))
+    return count + len(block)
+
+
+def write_sorted_digests(digests, path):
+    """Write the sorted, distinct digests to path with an external sort; return their count."""
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as directory:
+        runs = sorted_runs(digests, directory)
+        # Merge in rounds while there are too many runs to open at once
+        merges = 0
+        while len(runs) > MERGE_FAN_IN:
+            merged = []
+            for start in range(0, len(runs), MERGE_FAN_IN):
+                group = runs[start:start + MERGE_FAN_IN]
+                merged.append(os.path.join(directory, f"merge{merges}"))
+                merges += 1
+                merge_runs(group, merged[-1])
+                for run in group:
+                    os.remove(run)
+            runs = merged
+        return merge_runs(runs, path)
+
+
+def filter_size(count, false_positive_rate):
+    """Return (num_bits, num_hashes) for a Bloom filter over count entries."""
+    count = max(count, 1)
+    num_bits = max(8, math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+    num_hashes = max(1, round(num_bits / count * math.log(2)))
+    return num_bits, num_hashes
+
+
+def write_filter(path, digests, num_bits, num_hashes):
+    """Write a Bloom filter over digests, setting its bits through a memory map of the file."""
+    with open(path, "w+b") as file:
+        file.write(BLOOM_HEADER.pack(BLOOM_MAGIC, num_bits, num_hashes))
+        file.truncate(BLOOM_HEADER.size + (num_bits + 7) // 8)
+        with mmap.mmap(file.fileno(), 0) as bits:
+            offset = BLOOM_HEADER.size
+            for digest in digests:
+                for position in bloom_positions(digest, num_bits, num_hashes):
+                    bits[offset + (position >> 3)] |= 1 << (position & 7)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the breached-password Bloom filter from a hash list.")
+    parser.add_argument("input", help="file with one SHA-1 hash (or password, with --plaintext) per line")
+    parser.add_argument("--plaintext", action="store_true", help="input lines are passwords, not hashes")
+    parser.add_argument("--false-positive-rate", type=float, default=0.001,
+                        help="Bloom filter false positive rate (default: 0.001)")
+    parser.add_argument("--bloom-file", default=BLOOM_FILE, help="output Bloom filter path")
+    parser.add_argument("--hashes-file", default=HASHES_FILE, help="output sorted hash file path")
+    args = parser.parse_args()
+
+    if not 0 < args.false_positive_rate < 1:
+        parser.error("--false-positive-rate must be between 0 and 1")
+
+    for path in (args.bloom_file, args.hashes_file):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    # First pass: the sorted hash file, which also gives the count to size the filter by
+    count = write_sorted_digests(read_digests(args.input, args.plaintext), args.hashes_file)
+    num_bits, num_hashes = filter_size(count, args.false_positive_rate)
+    # Second pass: the filter's bits, from the sorted hash file
+    write_filter(args.bloom_file, read_run(args.hashes_file), num_bits, num_hashes)
+
+    print(f"Indexed {count} hashes: {num_bits} bits, {num_hashes} hash functions")
+    print(f"Wrote {args.bloom_file} and {args.hashes_file}")
+
+
+if __name__ == "__main__":
+    main()
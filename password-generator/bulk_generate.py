@@ -0,0 +1,105 @@
+import math
+import sys
+
+from password_core import random_chars
+
+# Passwords generated per task handed to a worker process
+CHUNK_SIZE = 50000
+
+# Counts below this are generated in-process; a pool isn't worth starting
+POOL_THRESHOLD = 2 * CHUNK_SIZE
+
+# Output file buffer size
+WRITE_BUFFER = 1 << 20
+
+
+def generate_chunk(count, length, charset, show_entropy=False):
+    """Generate `count` passwords as newline-terminated bytes."""
+    needed = count * length
+    chars = random_chars(needed, charset)
+
+    lines = [chars[i:i + length] for i in range(0, needed, length)]
+    if show_entropy:
+        suffix = f"\t{length * math.log2(len(charset)):.1f}".encode()
+        lines = [line + suffix for line in lines]
+    lines.append(b"")
+    return b"\n".join(lines)
+
+
+def generate_pronounceable_chunk(count, length, show_entropy=False):
+    """Generate `count` pronounceable passwords as newline-terminated bytes."""
+    from markov import generate_pronounceable
+
+    lines = []
+    for _ in range(count):
+        password, entropy = generate_pronounceable(length)
+        lines.append(f"{password}\t{entropy:.1f}\n" if show_entropy else password + "\n")
+    return "".join(lines).encode()
+
+
+def _generate_task(task):
+    count, length, charset, show_entropy = task
+    if charset is None:
+        return generate_pronounceable_chunk(count, length, show_entropy)
+    return generate_chunk(count, length, charset, show_entropy)
+
+
+def write_passwords(output, count, length, charset, workers=None, show_entropy=False):
+    """
+    Write `count` passwords to a binary file object.
+
+    A charset of None selects pronounceable passwords. Large counts are
+    split into chunks and spread across a process pool; each finished chunk
+    is written with a single write call.
+    """
+    tasks = [
+        (min(CHUNK_SIZE, count - start), length, charset, show_entropy)
+        for start in range(0, count, CHUNK_SIZE)
+    ]
+
+    if workers == 1 or count < POOL_THRESHOLD:
+        for task in tasks:
+            output.write(_generate_task(task))
+        return
+
+    # Imported here so interactive runs don't pay for multiprocessing
+    from multiprocessing import Pool
+
+    with Pool(workers) as pool:
+        for chunk in pool.imap_unordered(_generate_task, tasks):
+            output.write(chunk)
+
+
+def run(args, charset):
+    """Generate passwords for parsed command-line arguments.
+
+    A charset of None selects pronounceable passwords.
+    """
+    if args.length <= 0 or args.count <= 0:
+        print("Error: length and count must be positive numbers", file=sys.stderr)
+        return 1
+    if charset == "":
+        print("Error: At least one character set must be selected", file=sys.stderr)
+        return 1
+    if args.workers is not None and args.workers <= 0:
+        print("Error: workers must be a positive number", file=sys.stderr)
+        return 1
+
+    if args.output in (None, "-"):
+        write_passwords(sys.stdout.buffer, args.count, args.length, charset, args.workers, args.show_entropy)
+        sys.stdout.flush()
+    else:
+        with open(args.output, "wb", buffering=WRITE_BUFFER) as output:
+            write_passwords(output, args.count, args.length, charset, args.workers, args.show_entropy)
+    return 0
+
+
+def add_common_arguments(parser):
+    """Flags shared by both password generator command lines."""
+    parser.add_argument("-l", "--length", type=int, default=12, help="password length (default: 12)")
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of passwords to generate (default: 1)")
+    parser.add_argument("-o", "--output", help="write passwords to this file instead of standard output")
+    parser.add_argument("-j", "--workers", type=int,
+                        help="worker processes for large counts (default: one per CPU)")
+    parser.add_argument("--show-entropy", action="store_true",
+                        help="follow each password with a tab and its entropy in bits")
@@ -0,0 +1,118 @@
+import bisect
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into lowercase search tokens."""
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class DescriptionIndex:
+    """
+    Search and sort index for the saved passwords page.
+
+    Keeps an inverted index from description tokens to entry ids, with a
+    sorted vocabulary so each query word matches as a prefix, and the entry
+    ids ordered by created_at. A page of results is found without touching
+    the entries themselves, so only the rows being shown need to be loaded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._vocabulary = []
+        self._vocabulary_sorted = True
+        self._sort_keys = {}
+        self._order = []
+        self._order_sorted = True
+
+    def add(self, entry_id, entry):
+        """Index a saved entry. Adding the same id twice has no effect."""
+        with self._lock:
+            if entry_id in self._sort_keys:
+                return
+
+            sort_key = (entry.get("created_at") or "", entry_id)
+            self._sort_keys[entry_id] = sort_key
+            # Entries almost always arrive in date order; if not, sort on next read
+            if self._order and self._order[-1] > sort_key:
+                self._order_sorted = False
+            self._order.append(sort_key)
+
+            for token in set(tokenize(entry.get("description"))):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = []
+                    # Sorted lazily by the next search, so bulk loads stay linear
+                    self._vocabulary.append(token)
+                    self._vocabulary_sorted = False
+                postings.append(entry_id)
+
+    def _matching_ids(self, query):
+        """Ids whose description has a word starting with every query word."""
+        tokens = tokenize(query)
+        if tokens and not self._vocabulary_sorted:
+            self._vocabulary.sort()
+            self._vocabulary_sorted = True
+
+        matches = None
+        for token in tokens:
+            start = bisect.bisect_left(self._vocabulary, token)
+            end = bisect.bisect_left(self._vocabulary, token[:-1] + chr(ord(token[-1]) + 1))
+            ids = set()
+            for word in self._vocabulary[start:end]:
+                ids.update(self._postings[word])
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                break
+        return matches
+
+    def page(self, query="", newest_first=True, offset=0, limit=50):
+        """
+        Find one page of entries.
+
+        Args:
+            query (str): Words to look for in descriptions (empty for all)
+            newest_first (bool): Sort by created_at descending
+            offset (int): Number of matching entries to skip
+            limit (int): Maximum number of entry ids to return
+
+        Returns:
+            tuple: (list of entry ids for the page, total number of matches)
+        """
+        with self._lock:
+            if not self._order_sorted:
+                self._order.sort()
+                self._order_sorted = True
+            matches = self._matching_ids(query)
+
+            if matches is None:
+                total = len(self._order)
+                if newest_first:
+                    end = max(total - offset, 0)
+                    keys = reversed(self._order[max(end - limit, 0):end])
+                else:
+                    keys = self._order[offset:offset + limit]
+                return [entry_id for created_at, entry_id in keys], total
+
+            total = len(matches)
+            # Few matches: sort just those. Many: walk the date order instead
+            if total * 8 < len(self._order):
+                keys = sorted((self._sort_keys[entry_id] for entry_id in matches), reverse=newest_first)
+                return [entry_id for created_at, entry_id in keys[offset:offset + limit]], total
+
+            ids = []
+            skipped = 0
+            for created_at, entry_id in (reversed(self._order) if newest_first else self._order):
+                if entry_id not in matches:
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                ids.append(entry_id)
+                if len(ids) >= limit:
+                    break
+            return ids, total
@@ -0,0 +1,74 @@
+"""
+Turn on the encrypted vault and encrypt every saved password.
+
+Run it from the directory the web app runs in, with the app stopped. It
+asks for a new passphrase, writes vault.json and rewrites the saved
+passwords with each password encrypted individually. Running it again with
+the existing passphrase encrypts any entries that are still plaintext, and
+replaces reuse fingerprints made by older versions with install.key.
+
+Usage:
+    python encrypt_vault.py
+"""
+import argparse
+import getpass
+import sys
+
+from password_store import PasswordStore
+from vault import VAULT_FILE, Vault, VaultError, decrypt_password, encrypt_entry, fingerprint_password
+
+MIN_PASSPHRASE_LENGTH = 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encrypt the saved passwords with a passphrase.")
+    parser.add_argument("--passwords-file", default="saved_passwords.json", help="saved passwords snapshot")
+    parser.add_argument("--vault-file", default=VAULT_FILE, help="vault settings file")
+    args = parser.parse_args()
+
+    vault = Vault.load(args.vault_file)
+    if vault is not None:
+        try:
+            key = vault.unlock(getpass.getpass("Vault passphrase: "))
+        except VaultError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    else:
+        passphrase = getpass.getpass("New vault passphrase: ")
+        if len(passphrase) < MIN_PASSPHRASE_LENGTH:
+            print(f"Error: the passphrase must be at least {MIN_PASSPHRASE_LENGTH} characters", file=sys.stderr)
+            return 1
+        if getpass.getpass("Repeat passphrase: ") != passphrase:
+            print("Error: the passphrases don't match", file=sys.stderr)
+            return 1
+        # Written before any entry is encrypted, so a crash can't leave
+        # encrypted entries without the settings needed to decrypt them
+        vault, key = Vault.create(passphrase, args.vault_file)
+
+    store = PasswordStore(args.passwords_file)
+    entries = store.entries()
+
+    encrypted = 0
+    refingerprinted = 0
+    rewritten = []
+    for entry in entries:
+        if "ciphertext" not in entry:
+            entry = encrypt_entry(key, entry, fingerprint_password(key, entry["password"]))
+            encrypted += 1
+        else:
+            fingerprint = fingerprint_password(key, decrypt_password(key, entry)).hex()
+            if entry.get("fingerprint") != fingerprint:
+                entry = dict(entry, fingerprint=fingerprint)
+                refingerprinted += 1
+        rewritten.append(entry)
+
+    store.rewrite(rewritten)
+    store.close()
+    print(f"Encrypted {encrypted} of {len(entries)} saved passwords")
+    if refingerprinted:
+        print(f"Replaced the reuse fingerprints of {refingerprinted} passwords encrypted by an older version")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
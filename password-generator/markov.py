@@ -0,0 +1,91 @@
+import bisect
+import json
+import math
+import os
+import secrets
+from array import array
+
+# Model written by train_markov_model.py
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+MODEL_FILE = os.path.join(DATA_DIR, "markov.json")
+
+# Marks the start of a word in training contexts
+START = "^"
+
+_model = None
+
+
+class MarkovModel:
+    """
+    Character n-gram model for pronounceable passwords.
+
+    For every context (the previous `order - 1` characters, or fewer when
+    backing off) the model holds the possible next characters and their
+    cumulative frequencies as a compact array, so sampling a character is a
+    single bisect. The Shannon entropy of each context's distribution is
+    precomputed so the entropy of a generated password is just a sum.
+    """
+
+    def __init__(self, order, contexts):
+        self.order = order
+        self.contexts = {}
+        for context, (chars, counts) in contexts.items():
+            cumulative = array("L")
+            total = 0
+            for count in counts:
+                total += count
+                cumulative.append(total)
+            entropy = -sum(count / total * math.log2(count / total) for count in counts)
+            self.contexts[context] = (chars, cumulative, entropy)
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        with open(path, "r") as file:
+            data = json.load(file)
+        return cls(data["order"], data["contexts"])
+
+    def _distribution(self, text):
+        """Longest known context for the text generated so far."""
+        history = (START * (self.order - 1) + text)[-(self.order - 1):]
+        for start in range(len(history) + 1):
+            distribution = self.contexts.get(history[start:])
+            if distribution is not None:
+                return distribution
+        raise ValueError("Markov model has no empty context to back off to")
+
+    def generate(self, length, randbelow=secrets.randbelow):
+        """
+        Generate a pronounceable password.
+
+        Args:
+            length (int): Length of the password to generate
+            randbelow (callable): Source of random ints in [0, n); only
+                seeded_generator passes anything but secrets.randbelow
+
+        Returns:
+            tuple: (password, entropy in bits). The entropy is the sum of the
+            Shannon entropy of every distribution a character was drawn
+            from, which is far lower than log2(26 ** length).
+        """
+        text = ""
+        entropy = 0.0
+        while len(text) < length:
+            chars, cumulative, step_entropy = self._distribution(text)
+            index = bisect.bisect_right(cumulative, randbelow(cumulative[-1]))
+            text += chars[index]
+            entropy += step_entropy
+        return text, entropy
+
+
+def get_model():
+    """Return the shared model, loading it on first use."""
+    global _model
+
+    if _model is None:
+        _model = MarkovModel.load()
+    return _model
+
+
+def generate_pronounceable(length):
+    """Generate a pronounceable password and its entropy in bits."""
+    return get_model().generate(length)
@@ -0,0 +1,78 @@
+"""
+Password generation shared by the web app and both command-line tools.
+
+Keep this module cheap to import: it must not pull in Flask or heavy
+standard library modules (string, re, argparse, secrets), so the CLIs start
+quickly. Character tables are built on first use and cached.
+"""
+import os
+
+# Same characters as string.ascii_lowercase, ascii_uppercase, digits and punctuation
+LOWERCASE = "abcdefghijklmnopqrstuvwxyz"
+UPPERCASE = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITS = "0123456789"
+PUNCTUATION = "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"
+
+# Built lazily by _translation(); maps a charset to (byte table, rejected bytes)
+_translations = {}
+
+
+def build_charset(use_lowercase=True, use_uppercase=True, use_numbers=True, use_special=True):
+    """Combine the enabled character sets into one string."""
+    return (
+        (LOWERCASE if use_lowercase else "")
+        + (UPPERCASE if use_uppercase else "")
+        + (DIGITS if use_numbers else "")
+        + (PUNCTUATION if use_special else "")
+    )
+
+
+def _translation(charset):
+    """
+    Tables for mapping random bytes onto a charset with bytes.translate.
+
+    Byte values at or above the largest multiple of the charset size are
+    rejected, so every character is equally likely.
+    """
+    translation = _translations.get(charset)
+    if translation is None:
+        size = len(charset)
+        limit = 256 - 256 % size
+        table = bytes(ord(charset[b % size]) if b < limit else 0 for b in range(256))
+        translation = _translations[charset] = (table, bytes(range(limit, 256)), limit)
+    return translation
+
+
+def random_chars(count, charset):
+    """Return `count` characters drawn uniformly from the charset, as bytes.
+
+    Randomness comes from the OS CSPRNG (os.urandom), so separate processes
+    never share generator state.
+    """
+    table, rejected, limit = _translation(charset)
+    chars = bytearray()
+    while len(chars) < count:
+        missing = count - len(chars)
+        chars += os.urandom(missing * 256 // limit + 64).translate(table, rejected)
+    del chars[count:]
+    return chars
+
+
+def generate_password(length, use_lowercase=True, use_uppercase=True, use_numbers=True, use_special=True):
+    """
+    Generate a random password based on specified criteria.
+
+    Args:
+        length (int): Length of the password to generate
+        use_lowercase (bool): Include lowercase letters
+        use_uppercase (bool): Include uppercase letters
+        use_numbers (bool): Include numbers
+        use_special (bool): Include special characters
+
+    Returns:
+        str: Generated password, or None if no character set is selected
+    """
+    all_chars = build_charset(use_lowercase, use_uppercase, use_numbers, use_special)
+    if not all_chars:
+        return None
+    return random_chars(max(length, 0), all_chars).decode("ascii")
@@ -1,5 +1,6 @@
-import random
-import string
+import sys
+
+import password_core
 
 def generate_password(length, use_lowercase=True, use_uppercase=True, use_numbers=True, use_special=True):
     """
@@ -15,22 +16,11 @@ def generate_password(length, use_lowercase=True, use_uppercase=True, use_number
     Returns:
         str: Generated password
     """
-    # Define character sets
-    lowercase_chars = string.ascii_lowercase if use_lowercase else ""
-    uppercase_chars = string.ascii_uppercase if use_uppercase else ""
-    number_chars = string.digits if use_numbers else ""
-    special_chars = string.punctuation if use_special else ""
-    
-    # Combine all enabled character sets
-    all_chars = lowercase_chars + uppercase_chars + number_chars + special_chars
+    password = password_core.generate_password(length, use_lowercase, use_uppercase, use_numbers, use_special)
     
     # Ensure at least one character set is selected
-    if not all_chars:
+    if password is None:
         print("Error: At least one character set must be selected")
-        return None
-    
-    # Generate password
-    password = "".join(random.choice(all_chars) for _ in range(length))
     
     return password
 
@@ -62,5 +52,36 @@ def main():
     else:
         print("\nPassword generation failed. Please select at least one character set.")
 
+def cli(argv):
+    """Non-interactive mode, used when any command-line arguments are given."""
+    # Imported here so the interactive prompt starts without loading argparse
+    import argparse
+    from bulk_generate import add_common_arguments, run
+    
+    parser = argparse.ArgumentParser(
+        description="Generate random passwords. Run without arguments for interactive mode."
+    )
+    add_common_arguments(parser)
+    parser.add_argument("--no-lowercase", action="store_true", help="exclude lowercase letters")
+    parser.add_argument("--no-uppercase", action="store_true", help="exclude uppercase letters")
+    parser.add_argument("--no-numbers", action="store_true", help="exclude numbers")
+    parser.add_argument("--no-special", action="store_true", help="exclude special characters")
+    parser.add_argument("-p", "--pronounceable", action="store_true",
+                        help="generate pronounceable lowercase passwords instead of random characters")
+    args = parser.parse_args(argv)
+    
+    if args.pronounceable:
+        return run(args, None)
+    
+    charset = password_core.build_charset(
+        not args.no_lowercase,
+        not args.no_uppercase,
+        not args.no_numbers,
+        not args.no_special
+    )
+    return run(args, charset)
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
     main() 
\ No newline at end of file
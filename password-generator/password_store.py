@@ -0,0 +1,218 @@
+import json
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class PasswordStore:
+    """
+    Saved passwords kept as a JSON snapshot plus an append-only log.
+
+    New entries are appended to the log by a single background writer
+    thread. The writer drains every save that is waiting when it wakes up
+    and commits them with one write and one fsync (group commit), so
+    concurrent saves never race and each save costs the same regardless of
+    how many passwords are already stored. Every `compact_every` records the
+    writer folds the log back into the snapshot.
+
+    Entries are identified by their position, which never changes because
+    entries are only ever appended. Readers use the in-memory view, which
+    only ever contains committed entries. The store assumes it is the only
+    process writing the files.
+    """
+
+    def __init__(self, snapshot_file, log_file=None, compact_every=1000):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file or os.path.splitext(snapshot_file)[0] + ".log"
+        self.compact_every = compact_every
+
+        self._entries = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = None
+        self._log_records = 0
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read_files()
+
+    def _read_files(self):
+        """Load the snapshot and replay the log on top of it."""
+        entries = []
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r') as file:
+                try:
+                    entries = json.load(file)
+                except json.JSONDecodeError:
+                    entries = []
+
+        self._log_records = 0
+        if os.path.exists(self.log_file):
+            good_offset = 0
+            with open(self.log_file, 'rb') as file:
+                for line in file:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("incomplete record")
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final record from a crash mid-write
+                        break
+                    good_offset += len(line)
+                    # Skip records a compaction already folded into the snapshot
+                    if record.pop("id", len(entries)) < len(entries):
+                        continue
+                    entries.append(record)
+                    self._log_records += 1
+            if good_offset < os.path.getsize(self.log_file):
+                with open(self.log_file, 'r+b') as file:
+                    file.truncate(good_offset)
+        return entries
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run_writer, name="password-store-writer", daemon=True)
+                self._writer.start()
+
+    def entries(self):
+        """Return a list of all committed entries, oldest first."""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, entry_id):
+        """Return the entry with the given id, or None."""
+        self._ensure_loaded()
+        with self._lock:
+            if 0 <= entry_id < len(self._entries):
+                return self._entries[entry_id]
+        return None
+
+    def count(self):
+        """Return the number of committed entries."""
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def append(self, entry, timeout=None):
+        """Durably append an entry and return its id.
+
+        Blocks until the entry has been written and fsynced.
+        """
+        self._ensure_loaded()
+        self._ensure_writer()
+        future = Future()
+        self._queue.put(("append", entry, future))
+        return future.result(timeout)
+
+    def compact(self, timeout=None):
+        """Rewrite the snapshot with every entry and empty the log."""
+        self._ensure_loaded()
+        self._ensure_writer()
+        future = Future()
+        self._queue.put(("compact", None, future))
+        return future.result(timeout)
+
+    def rewrite(self, entries, timeout=None):
+        """Replace every entry (keeping their order and ids) and compact."""
+        self._ensure_loaded()
+        self._ensure_writer()
+        future = Future()
+        self._queue.put(("rewrite", list(entries), future))
+        return future.result(timeout)
+
+    def close(self):
+        """Stop the writer thread once everything queued has been written."""
+        if self._writer is not None and self._writer.is_alive():
+            future = Future()
+            self._queue.put(("stop", None, future))
+            future.result()
+            self._writer.join()
+
+    def _run_writer(self):
+        while True:
+            # Block for the first request, then take everything else waiting
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            appends = [(entry, future) for op, entry, future in batch if op == "append"]
+            if appends:
+                self._commit(appends)
+
+            compact_requested = False
+            stop_requested = False
+            for op, entry, future in batch:
+                if op in ("compact", "rewrite"):
+                    compact_requested = True
+                elif op == "stop":
+                    stop_requested = True
+                if op == "rewrite":
+                    with self._lock:
+                        # Entries appended since the rewrite was requested are kept
+                        self._entries[:len(entry)] = entry
+
+            if compact_requested or self._log_records >= self.compact_every:
+                try:
+                    self._compact()
+                    error = None
+                except OSError as e:
+                    error = e
+                for op, entry, future in batch:
+                    if op in ("compact", "rewrite"):
+                        if error is None:
+                            future.set_result(True)
+                        else:
+                            future.set_exception(error)
+
+            if stop_requested:
+                for op, entry, future in batch:
+                    if op == "stop":
+                        future.set_result(True)
+                return
+
+    def _commit(self, appends):
+        """Write a group of entries with a single write and fsync."""
+        # Only the writer thread appends, so the next id cannot change under us
+        first_id = len(self._entries)
+        data = "".join(
+            json.dumps(dict(entry, id=first_id + offset)) + "\n"
+            for offset, (entry, future) in enumerate(appends)
+        )
+        try:
+            with open(self.log_file, 'a') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+        except OSError as e:
+            for entry, future in appends:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self._entries.extend(entry for entry, future in appends)
+        self._log_records += len(appends)
+        for offset, (entry, future) in enumerate(appends):
+            future.set_result(first_id + offset)
+
+    def _compact(self):
+        """Fold the log into a new snapshot, replaced atomically."""
+        with self._lock:
+            entries = list(self._entries)
+
+        temp_file = self.snapshot_file + ".tmp"
+        with open(temp_file, 'w') as file:
+            json.dump(entries, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file, self.snapshot_file)
+
+        # The snapshot now holds every logged entry, so the log can go
+        with open(self.log_file, 'w') as file:
+            os.fsync(file.fileno())
+        self._log_records = 0
@@ -0,0 +1,90 @@
+import threading
+import time
+
+# Number of independently locked shards; requests only contend within a shard
+SHARDS = 16
+
+# Idle clients are forgotten once a shard tracks this many
+MAX_CLIENTS_PER_SHARD = 4096
+
+
+class ShardedCounter:
+    """
+    Counter spread over several independently locked cells.
+
+    Each thread increments the cell picked by its thread id, so concurrent
+    requests rarely wait on the same lock. Reading sums all the cells.
+    """
+
+    def __init__(self, shards=SHARDS):
+        self._cells = [[threading.Lock(), 0] for _ in range(shards)]
+
+    def increment(self, amount=1):
+        cell = self._cells[threading.get_ident() % len(self._cells)]
+        with cell[0]:
+            cell[1] += amount
+
+    @property
+    def value(self):
+        return sum(cell[1] for cell in self._cells)
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token bucket rate limiter.
+
+    Each client may make `burst` requests at once, refilled at `rate`
+    requests per second. Buckets are spread over shards by client key, each
+    with its own lock, and are stored as (tokens, last refill time) pairs
+    that are only updated when the client makes a request.
+    """
+
+    def __init__(self, rate, burst, shards=SHARDS):
+        self.rate = rate
+        self.burst = burst
+        self._shards = [(threading.Lock(), {}) for _ in range(shards)]
+
+    def allow(self, key):
+        """Take a token for the client. Returns False if it has none left."""
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            tokens, last = buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)
+
+            if len(buckets) > MAX_CLIENTS_PER_SHARD:
+                self._forget_idle(buckets, now)
+        return allowed
+
+    def retry_after(self):
+        """Seconds until a client that was refused has a token again."""
+        return max(1, round(1 / self.rate))
+
+    def _forget_idle(self, buckets, now):
+        """Drop clients whose bucket has refilled; they behave like new clients."""
+        for key, (tokens, last) in list(buckets.items()):
+            if tokens + (now - last) * self.rate >= self.burst:
+                del buckets[key]
+
+
+class ConcurrencyGate:
+    """
+    Caps the number of requests being handled at once.
+
+    Entering never waits: when the gate is full the caller is refused
+    straight away, so excess load is shed instead of queueing.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def try_enter(self):
+        return self._slots.acquire(blocking=False)
+
+    def exit(self):
+        self._slots.release()
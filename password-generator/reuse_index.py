@@ -0,0 +1,72 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+
+
+def load_install_key(path):
+    """Load the per-install HMAC key, creating it on first run."""
+    if os.path.exists(path):
+        with open(path, 'rb') as file:
+            key = file.read()
+        if len(key) >= 32:
+            return key
+
+    key = secrets.token_bytes(32)
+    # Readable by the owner only; the key is what keeps the index opaque
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as file:
+        file.write(key)
+    return key
+
+
+class ReuseIndex:
+    """
+    Keyed-hash index from password to the ids of the entries that use it.
+
+    Passwords are stored only as HMAC-SHA256 fingerprints under a key that
+    is unique to this install, so the index never holds plaintext and its
+    fingerprints can't be matched against precomputed hash tables. Finding
+    earlier uses of a password is a single dict lookup.
+    """
+
+    def __init__(self, key):
+        self._key = key
+        self._lock = threading.Lock()
+        self._groups = {}
+        # Fingerprints used by more than one entry, for the reuse report
+        self._reused = set()
+
+    def fingerprint(self, password):
+        return hmac.digest(self._key, password.encode('utf-8'), hashlib.sha256)
+
+    def add(self, password, entry_id):
+        """Index an entry and return the ids of earlier entries with the same password."""
+        return self.add_fingerprint(self.fingerprint(password), entry_id)
+
+    def add_fingerprint(self, fingerprint, entry_id):
+        """Index an entry by a fingerprint computed earlier (e.g. stored in the vault)."""
+        with self._lock:
+            ids = self._groups.setdefault(fingerprint, [])
+            if entry_id in ids:
+                return [other for other in ids if other != entry_id]
+            others = list(ids)
+            ids.append(entry_id)
+            if len(ids) > 1:
+                self._reused.add(fingerprint)
+            return others
+
+    def find(self, password):
+        """Return the ids of every entry that uses the password."""
+        return self.find_fingerprint(self.fingerprint(password))
+
+    def find_fingerprint(self, fingerprint):
+        """Return the ids of every entry with this fingerprint."""
+        with self._lock:
+            return list(self._groups.get(fingerprint, []))
+
+    def reused_groups(self):
+        """Return one list of entry ids per password saved more than once."""
+        with self._lock:
+            return [list(self._groups[fingerprint]) for fingerprint in self._reused]
@@ -0,0 +1,66 @@
+"""
+Deterministic password generation for tests, fixtures and load tests.
+
+NOT FOR REAL PASSWORDS. Anyone who knows the seed can reproduce every
+password. The app and the command-line tools never use this module.
+"""
+import hashlib
+import random
+
+from password_core import build_charset
+
+
+class SeededPasswordGenerator:
+    """
+    Password generator whose output is fully determined by its seed.
+
+    The same seed produces the same passwords byte for byte, in any process
+    and on any Python 3 version: indexes are drawn from random.Random's
+    getrandbits (Mersenne Twister) with our own rejection sampling, rather
+    than relying on helpers like random.choice whose internals may change.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+        self._random = random.Random(_seed_to_int(seed))
+
+    def _randbelow(self, n):
+        bits = n.bit_length()
+        while True:
+            value = self._random.getrandbits(bits)
+            if value < n:
+                return value
+
+    def generate_password(self, length, use_lowercase=True, use_uppercase=True, use_numbers=True, use_special=True):
+        """Same arguments and result as password_core.generate_password."""
+        all_chars = build_charset(use_lowercase, use_uppercase, use_numbers, use_special)
+        if not all_chars:
+            return None
+        size = len(all_chars)
+        return "".join(all_chars[self._randbelow(size)] for _ in range(length))
+
+    def generate_pronounceable(self, length):
+        """Same result as markov.generate_pronounceable: (password, entropy bits)."""
+        from markov import get_model
+
+        return get_model().generate(length, randbelow=self._randbelow)
+
+    def passwords(self, count, length, **options):
+        """Return a list of `count` passwords."""
+        return [self.generate_password(length, **options) for _ in range(count)]
+
+    def stream(self, stream_id):
+        """
+        Independent generator derived from this seed and a stream id.
+
+        Give each worker process or test case its own stream so results
+        don't depend on how work is scheduled between them.
+        """
+        return SeededPasswordGenerator(f"{self.seed}/{stream_id}")
+
+
+def _seed_to_int(seed):
+    """Stable integer for any seed, independent of PYTHONHASHSEED."""
+    if isinstance(seed, int):
+        return seed
+    return int.from_bytes(hashlib.sha256(str(seed).encode("utf-8")).digest(), "big")
@@ -1,5 +1,6 @@
-import random
-import string
+import sys
+
+import password_core
 
 def generate_password(length):
     """
@@ -12,13 +13,7 @@ def generate_password(length):
     Returns:
         str: Generated password
     """
-    # Define character sets
-    all_chars = string.ascii_lowercase + string.ascii_uppercase + string.digits + string.punctuation
-    
-    # Generate password
-    password = "".join(random.choice(all_chars) for _ in range(length))
-    
-    return password
+    return password_core.generate_password(length)
 
 def main():
     print("==== Password Generator ====")
@@ -38,5 +33,20 @@ def main():
     password = generate_password(length)
     print("\nGenerated Password:", password)
 
+def cli(argv):
+    """Non-interactive mode, used when any command-line arguments are given."""
+    # Imported here so the interactive prompt starts without loading argparse
+    import argparse
+    from bulk_generate import add_common_arguments, run
+    
+    parser = argparse.ArgumentParser(
+        description="Generate random passwords using all character types. Run without arguments for interactive mode."
+    )
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+    return run(args, password_core.build_charset())
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
     main() 
\ No newline at end of file
@@ -0,0 +1,326 @@
+import math
+import os
+import re
+
+# Frequency-ranked word lists, most common first (one word per line)
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DICTIONARY_FILES = {
+    "passwords": "passwords.txt",
+    "english": "english.txt",
+}
+
+# Keyboard rows (unshifted, shifted) used to detect keyboard walks
+KEYBOARD_ROWS = [
+    ("`1234567890-=", "~!@#$%^&*()_+"),
+    ("qwertyuiop[]\\", "QWERTYUIOP{}|"),
+    ("asdfghjkl;'", 'ASDFGHJKL:"'),
+    ("zxcvbnm,./", "ZXCVBNM<>?"),
+]
+
+# Common character substitutions ("p4ssw0rd" -> "password")
+L33T_TABLE = str.maketrans("4@3!10$5+7", "aaeiiosstt")
+
+# Only this many leading characters are scored, as in zxcvbn; the pattern
+# search grows with the square of the length, and 100 characters of any
+# password is already far past the top score
+MAX_SCORED_LENGTH = 100
+
+# log10(guesses) thresholds for scores 1, 2, 3 and 4
+SCORE_THRESHOLDS = (3, 6, 8, 10)
+STRENGTH_LABELS = ["Weak", "Weak", "Moderate", "Strong", "Strong"]
+
+FEEDBACK = {
+    "dictionary": "Avoid common passwords and dictionary words",
+    "spatial": "Avoid keyboard patterns like qwerty or asdf",
+    "repeat": "Avoid repeated characters and repeated words",
+}
+
+REPEAT_GREEDY = re.compile(r"(.+)\1+")
+REPEAT_LAZY = re.compile(r"(.+?)\1+")
+REPEAT_BASE = re.compile(r"^(.+?)\1+$")
+
+# Loaded once on first use, see _load_dictionaries()
+_ranked_words = None
+_dictionary_names = None
+_max_word_length = 0
+_keyboard_graph = None
+
+
+def _load_dictionaries():
+    """Load the ranked word lists into a single word -> packed rank dict.
+
+    Each value packs the rank and the dictionary it came from into one
+    int (rank << 2 | dictionary index), keeping the table small.
+    """
+    global _ranked_words, _dictionary_names, _max_word_length
+
+    ranked = {}
+    names = list(DICTIONARY_FILES)
+    for dict_index, name in enumerate(names):
+        with open(os.path.join(DATA_DIR, DICTIONARY_FILES[name]), "r") as file:
+            for rank, line in enumerate(file, start=1):
+                word = line.strip().lower()
+                if not word:
+                    continue
+                packed = rank << 2 | dict_index
+                # Keep the best (lowest) rank when a word is in several lists
+                if word not in ranked or ranked[word] >> 2 > rank:
+                    ranked[word] = packed
+
+    _dictionary_names = names
+    _max_word_length = max((len(word) for word in ranked), default=0)
+    _ranked_words = ranked
+
+
+def _build_keyboard_graph():
+    """Map every key character to (row, column, shifted)."""
+    global _keyboard_graph
+
+    graph = {}
+    for row, (plain, shifted) in enumerate(KEYBOARD_ROWS):
+        for column, char in enumerate(plain):
+            graph[char] = (row, column, False)
+        for column, char in enumerate(shifted):
+            graph[char] = (row, column, True)
+    _keyboard_graph = graph
+
+
+def _ensure_loaded():
+    if _ranked_words is None:
+        _load_dictionaries()
+    if _keyboard_graph is None:
+        _build_keyboard_graph()
+
+
+def _cardinality(password):
+    """Size of the character space a brute-force attack would need."""
+    size = 0
+    if any(c.islower() for c in password):
+        size += 26
+    if any(c.isupper() for c in password):
+        size += 26
+    if any(c.isdigit() for c in password):
+        size += 10
+    if any(not c.isalnum() for c in password):
+        size += 33
+    return size or 10
+
+
+def _uppercase_variations(token):
+    """Number of capitalisations an attacker would try for a word."""
+    upper = sum(1 for c in token if c.isupper())
+    if upper == 0:
+        return 1
+    lower = sum(1 for c in token if c.islower())
+    if lower == 0 or (upper == 1 and token[0].isupper()):
+        return 2
+    return sum(math.comb(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+def _dictionary_matches(password):
+    """Find every substring of the password that is a ranked word."""
+    matches = []
+    lowered = password.lower()
+    unleeted = lowered.translate(L33T_TABLE)
+    candidates = [(lowered, False)]
+    if unleeted != lowered:
+        candidates.append((unleeted, True))
+
+    length = len(password)
+    for text, l33t in candidates:
+        for i in range(length):
+            for j in range(i + 3, min(length, i + _max_word_length) + 1):
+                # Plain substrings were already looked up in the first pass
+                if l33t and text[i:j] == lowered[i:j]:
+                    continue
+                packed = _ranked_words.get(text[i:j])
+                if packed is None:
+                    continue
+                rank = packed >> 2
+                guesses = rank * _uppercase_variations(password[i:j])
+                if l33t:
+                    guesses *= 2
+                matches.append({
+                    "pattern": "dictionary",
+                    "i": i,
+                    "j": j,
+                    "token": password[i:j],
+                    "dictionary": _dictionary_names[packed & 3],
+                    "rank": rank,
+                    "l33t": l33t,
+                    "guesses": guesses,
+                })
+    return matches
+
+
+def _spatial_guesses(length, turns, shifted):
+    """Estimate the guesses needed for a keyboard walk."""
+    starts = len(_keyboard_graph) // 2
+    degree = 4
+    guesses = 0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, j - 1) * starts * degree ** j
+    if shifted:
+        guesses *= 2
+    return max(guesses, starts)
+
+
+def _spatial_matches(password):
+    """Find runs of three or more adjacent keys (e.g. "qwerty", "zxcvb")."""
+    matches = []
+    length = len(password)
+    i = 0
+    while i < length - 2:
+        j = i + 1
+        turns = 0
+        direction = None
+        shifted = False
+        while j < length:
+            prev = _keyboard_graph.get(password[j - 1])
+            cur = _keyboard_graph.get(password[j])
+            if prev is None or cur is None:
+                break
+            step = (cur[0] - prev[0], cur[1] - prev[1])
+            # Neighbouring keys on the same row or on the row above/below
+            if step not in ((0, 1), (0, -1), (1, 0), (1, -1), (-1, 0), (-1, 1)):
+                break
+            if step != direction:
+                turns += 1
+                direction = step
+            shifted = shifted or cur[2] or prev[2]
+            j += 1
+        if j - i >= 3:
+            matches.append({
+                "pattern": "spatial",
+                "i": i,
+                "j": j,
+                "token": password[i:j],
+                "turns": turns,
+                "guesses": _spatial_guesses(j - i, turns, shifted),
+            })
+            i = j - 1
+        else:
+            i += 1
+    return matches
+
+
+def _repeat_matches(password):
+    """Find repeated characters or substrings ("aaaa", "abcabc")."""
+    matches = []
+    pos = 0
+    while pos < len(password):
+        greedy = REPEAT_GREEDY.search(password, pos)
+        if greedy is None:
+            break
+        lazy = REPEAT_LAZY.search(password, pos)
+        if len(greedy.group(0)) > len(lazy.group(0)):
+            match = greedy
+            base = REPEAT_BASE.match(match.group(0)).group(1)
+        else:
+            match = lazy
+            base = match.group(1)
+        count = len(match.group(0)) // len(base)
+        matches.append({
+            "pattern": "repeat",
+            "i": match.start(),
+            "j": match.end(),
+            "token": match.group(0),
+            "base": base,
+            "repeat_count": count,
+            "guesses": 10 ** _estimate(base)[0] * count,
+        })
+        pos = match.end()
+    return matches
+
+
+def _estimate(password):
+    """Return (log10 guesses, matches) for the cheapest way to guess the password.
+
+    Uses dynamic programming over the password: best[k] is the log10 of the
+    fewest guesses needed for the first k characters, where each step either
+    brute-forces one character or consumes a whole pattern match.
+    """
+    length = len(password)
+    if length == 0:
+        return 0.0, []
+
+    ends = [[] for _ in range(length + 1)]
+    for match in _dictionary_matches(password) + _spatial_matches(password) + _repeat_matches(password):
+        # A pattern is never cheaper than guessing a couple of characters
+        match["guesses"] = max(match["guesses"], 10 if match["j"] - match["i"] == 1 else 50)
+        ends[match["j"]].append(match)
+
+    char_cost = math.log10(_cardinality(password))
+    best = [0.0] + [math.inf] * length
+    back = [None] * (length + 1)
+    for k in range(1, length + 1):
+        best[k] = best[k - 1] + char_cost
+        back[k] = None
+        for match in ends[k]:
+            cost = best[match["i"]] + math.log10(match["guesses"])
+            if cost < best[k]:
+                best[k] = cost
+                back[k] = match
+
+    # Walk the back-pointers to recover the winning sequence of matches
+    sequence = []
+    k = length
+    while k > 0:
+        match = back[k]
+        if match is None:
+            k -= 1
+        else:
+            sequence.append(match)
+            k = match["i"]
+    sequence.reverse()
+
+    # Kept as a log: the guesses themselves overflow a float past ~300 digits
+    return best[length], sequence
+
+
+def estimate_strength(password, details=True):
+    """
+    Estimate how hard a password is to guess.
+
+    Args:
+        password (str): Password to score
+        details (bool): Include the matched patterns and feedback
+
+    Returns:
+        dict: Score from 0 (weakest) to 4 (strongest), label, log10 of the
+        estimated guesses and entropy bits, plus matches and feedback when
+        details is True. Only the first MAX_SCORED_LENGTH characters count.
+    """
+    _ensure_loaded()
+
+    guesses_log10, sequence = _estimate(password[:MAX_SCORED_LENGTH])
+    guesses_log10 = max(guesses_log10, 0.0)
+    score = sum(1 for threshold in SCORE_THRESHOLDS if guesses_log10 >= threshold)
+
+    result = {
+        "score": score,
+        "label": STRENGTH_LABELS[score],
+        "guesses_log10": round(guesses_log10, 2),
+        "entropy_bits": round(guesses_log10 * math.log2(10), 1),
+    }
+    if details:
+        result["matches"] = [
+            {key: value for key, value in match.items() if key not in ("i", "j")}
+            for match in sequence
+        ]
+        result["feedback"] = sorted({FEEDBACK[match["pattern"]] for match in sequence})
+    return result
+
+
+def estimate_batch(passwords, details=False):
+    """Score many passwords, estimating each distinct password only once."""
+    _ensure_loaded()
+
+    cache = {}
+    results = []
+    for password in passwords:
+        if password not in cache:
+            cache[password] = estimate_strength(password, details)
+        results.append(cache[password])
+    return results
@@ -0,0 +1,62 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import breach
+from build_breach_filter import filter_size, write_filter
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # The app keeps its saved passwords in the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(breach, "BLOOM_FILE", str(tmp_path / "breached.bloom"))
+    monkeypatch.setattr(breach, "HASHES_FILE", str(tmp_path / "breached.sha1"))
+    monkeypatch.setattr(breach, "_checker", None)
+    monkeypatch.setattr(breach, "_checker_loaded", False)
+    sys.modules.pop("app", None)
+    app = importlib.import_module("app")
+    yield app
+    app.store.close()
+    if breach._checker is not None:
+        breach._checker.close()
+
+
+def write_corpus(passwords):
+    digests = sorted({breach.password_digest(password) for password in passwords})
+    with open(breach.HASHES_FILE, "wb") as file:
+        file.write(b"".join(digests))
+    write_filter(breach.BLOOM_FILE, digests, *filter_size(len(digests), 0.001))
+
+
+def test_breach_check(app):
+    write_corpus(["password", "letmein"])
+    client = app.app.test_client()
+    assert client.post("/breach", json={"password": "letmein"}).get_json() == {"breached": True}
+    assert client.post("/breach", json={"password": "x7!kQ2#vLp9z"}).get_json() == {"breached": False}
+    assert client.post("/save", json={"password": "password"}).get_json()["breached"] is True
+
+
+def test_corrupt_filter_is_an_error_on_every_request(app, caplog):
+    write_corpus(["password"])
+    with open(breach.BLOOM_FILE, "r+b") as file:
+        file.truncate(breach.BLOOM_HEADER.size + 1)
+    client = app.app.test_client()
+
+    for _ in range(2):
+        response = client.post("/breach", json={"password": "password"})
+        assert response.status_code == 503
+        assert "could not be opened" in response.get_json()["error"]
+    assert client.post("/generate", data={"length": 12, "lowercase": "on"}).status_code == 503
+    response = client.post("/save", json={"password": "password"})
+    assert response.status_code == 200
+    assert "breached" not in response.get_json() and "breach_error" in response.get_json()
+    assert "could not be opened" in caplog.text
+
+    # Rebuilding the filter takes effect without a restart
+    write_corpus(["password"])
+    assert client.post("/breach", json={"password": "password"}).get_json() == {"breached": True}
@@ -0,0 +1,44 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # The app keeps its saved passwords in the working directory
+    monkeypatch.chdir(tmp_path)
+    sys.modules.pop("app", None)
+    app = importlib.import_module("app")
+    yield app.app.test_client()
+    app.store.close()
+
+
+def test_long_password_through_every_strength_endpoint(client):
+    response = client.post("/generate", data={"length": 200, "lowercase": "on", "uppercase": "on", "numbers": "on", "special": "on"})
+    password = response.get_json()["password"]
+    assert len(password) == 200
+
+    response = client.post("/strength", json={"password": password})
+    assert response.status_code == 200
+    assert response.get_json()["score"] == 4
+
+    response = client.post("/strength/batch", json={"passwords": ["password", password]})
+    assert response.status_code == 200
+    assert [result["score"] for result in response.get_json()["results"]] == [0, 4]
+
+    assert client.post("/save", json={"password": password, "description": "long"}).status_code == 200
+    response = client.get("/strength/saved")
+    assert response.status_code == 200
+    assert response.get_json()["summary"]["Strong"] == 1
+
+
+def test_batch_character_limit(client):
+    import app
+
+    passwords = ["x" * 1000] * (app.MAX_BATCH_CHARACTERS // 1000 + 1)
+    response = client.post("/strength/batch", json={"passwords": passwords})
+    assert response.status_code == 400
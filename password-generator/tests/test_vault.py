@@ -0,0 +1,47 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSPHRASE = "correct horse battery staple"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # The app keeps its saved passwords and vault settings in the working directory
+    monkeypatch.chdir(tmp_path)
+    from vault import Vault
+    Vault.create(PASSPHRASE)
+    sys.modules.pop("app", None)
+    app = importlib.import_module("app")
+    yield app
+    app.store.close()
+
+
+@pytest.mark.parametrize("body", [
+    {},
+    {"data": "not json", "content_type": "text/plain"},
+    {"json": ["passphrase"]},
+    {"json": {}},
+    {"json": {"passphrase": 12345}},
+])
+def test_unlock_without_a_passphrase_is_a_bad_request(app, body):
+    response = app.app.test_client().post("/vault/unlock", **body)
+    assert response.status_code == 400
+
+
+def test_save_fingerprints_the_password_once(app, monkeypatch):
+    client = app.app.test_client()
+    assert client.post("/vault/unlock", json={"passphrase": PASSPHRASE}).status_code == 200
+
+    calls = []
+    fingerprint = app.password_fingerprint
+    monkeypatch.setattr(app, "password_fingerprint", lambda *args: calls.append(args) or fingerprint(*args))
+    assert client.post("/save", json={"password": "hunter2", "description": "first"}).status_code == 200
+    assert len(calls) == 1
+
+    response = client.post("/save", json={"password": "hunter2", "description": "second"})
+    assert [entry["description"] for entry in response.get_json()["reused_with"]] == ["first"]
@@ -0,0 +1,73 @@
+"""
+Train the pronounceable-password Markov model from a word list.
+
+The input has one word per line, optionally followed by whitespace and a
+count to weight it. Only lowercase letters are kept. The model is written
+as JSON holding, for every context, the next characters and their counts.
+
+Usage:
+    python train_markov_model.py words.txt
+    python train_markov_model.py --order 4 words.txt
+"""
+import argparse
+import json
+import os
+from collections import Counter, defaultdict
+
+from markov import MODEL_FILE, START
+
+
+def read_words(path):
+    """Yield (word, weight) pairs from the word list."""
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        for line in file:
+            parts = line.split()
+            if not parts:
+                continue
+            word = "".join(c for c in parts[0].lower() if "a" <= c <= "z")
+            weight = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 1
+            if word:
+                yield word, weight
+
+
+def train(words, order):
+    """Count next-character frequencies for contexts of 0 to order - 1 characters."""
+    counts = defaultdict(Counter)
+    for word, weight in words:
+        padded = START * (order - 1) + word
+        for i, char in enumerate(word):
+            end = i + order - 1
+            for size in range(order):
+                counts[padded[end - size:end]][char] += weight
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the pronounceable-password Markov model.")
+    parser.add_argument("input", help="word list, one word per line with an optional count")
+    parser.add_argument("--order", type=int, default=3, help="n-gram order (default: 3)")
+    parser.add_argument("--output", default=MODEL_FILE, help="model file to write")
+    args = parser.parse_args()
+
+    if args.order < 1:
+        parser.error("--order must be at least 1")
+
+    counts = train(read_words(args.input), args.order)
+    if "" not in counts:
+        parser.error("the word list contains no usable words")
+
+    contexts = {}
+    for context in sorted(counts):
+        chars = sorted(counts[context])
+        contexts[context] = ["".join(chars), [counts[context][char] for char in chars]]
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as file:
+        json.dump({"order": args.order, "contexts": contexts}, file, separators=(",", ":"))
+
+    print(f"Trained order-{args.order} model with {len(contexts)} contexts")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+
+# Vault settings (salt, scrypt cost, passphrase check); its presence turns the vault on
+VAULT_FILE = "vault.json"
+
+# scrypt cost parameters; about 50ms per derivation, which is why keys are cached
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+NONCE_SIZE = 12
+CHECK_PLAINTEXT = b"password-generator vault"
+
+# Derives the reuse-index fingerprint key from the vault key
+FINGERPRINT_CONTEXT = b"password-generator reuse fingerprint"
+
+# Unlocked sessions are forgotten after this long without use, and expired
+# sessions are swept out of memory at most this often
+SESSION_TIMEOUT = 30 * 60
+SESSION_PURGE_INTERVAL = 60
+
+
+class VaultError(Exception):
+    """Raised for a wrong passphrase or a record that fails to decrypt."""
+
+
+def _aesgcm(key):
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError:
+        raise RuntimeError("The encrypted vault needs the cryptography package: pip install cryptography")
+    return AESGCM(key)
+
+
+def _associated_data(description, created_at):
+    # Binds each ciphertext to its entry, so records can't be swapped around
+    return json.dumps([description or "", created_at or ""]).encode("utf-8")
+
+
+def encrypt_password(key, password, description, created_at):
+    """Encrypt one password with AES-256-GCM and return it base64 encoded."""
+    nonce = secrets.token_bytes(NONCE_SIZE)
+    ciphertext = _aesgcm(key).encrypt(nonce, password.encode("utf-8"), _associated_data(description, created_at))
+    return base64.b64encode(nonce + ciphertext).decode("ascii")
+
+
+def decrypt_password(key, entry):
+    """Decrypt the password of a single vault entry."""
+    aesgcm = _aesgcm(key)
+    from cryptography.exceptions import InvalidTag
+
+    data = base64.b64decode(entry["ciphertext"])
+    try:
+        plaintext = aesgcm.decrypt(
+            data[:NONCE_SIZE],
+            data[NONCE_SIZE:],
+            _associated_data(entry.get("description"), entry.get("created_at"))
+        )
+    except InvalidTag:
+        raise VaultError("Saved password could not be decrypted")
+    return plaintext.decode("utf-8")
+
+
+def fingerprint_password(key, password):
+    """Return the reuse-index fingerprint of a vault password.
+
+    Keyed by a subkey of the vault key rather than install.key, which sits
+    unencrypted next to the vault: otherwise the stored fingerprints would
+    let anyone with a copy check guesses without the passphrase.
+    """
+    fingerprint_key = hmac.digest(key, FINGERPRINT_CONTEXT, hashlib.sha256)
+    return hmac.digest(fingerprint_key, password.encode("utf-8"), hashlib.sha256)
+
+
+def encrypt_entry(key, entry, fingerprint):
+    """Return a copy of a saved entry with its password encrypted.
+
+    The reuse-index fingerprint (from fingerprint_password) is stored
+    alongside, so reuse can still be detected without decrypting anything.
+    """
+    encrypted = {name: value for name, value in entry.items() if name != "password"}
+    encrypted["ciphertext"] = encrypt_password(key, entry["password"], entry.get("description"), entry.get("created_at"))
+    encrypted["fingerprint"] = fingerprint.hex()
+    return encrypted
+
+
+class Vault:
+    """Key derivation settings for an encrypted vault."""
+
+    def __init__(self, settings):
+        self.settings = settings
+
+    @classmethod
+    def load(cls, path=VAULT_FILE):
+        """Return the vault configured at path, or None if there isn't one."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as file:
+            return cls(json.load(file))
+
+    @classmethod
+    def create(cls, passphrase, path=VAULT_FILE):
+        """Write new vault settings for a passphrase and return (vault, key)."""
+        vault = cls({
+            "kdf": "scrypt",
+            "salt": base64.b64encode(secrets.token_bytes(16)).decode("ascii"),
+            "n": SCRYPT_N,
+            "r": SCRYPT_R,
+            "p": SCRYPT_P,
+        })
+        key = vault._derive(passphrase)
+        vault.settings["check"] = encrypt_password(key, CHECK_PLAINTEXT.decode("ascii"), "", "")
+
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as file:
+            json.dump(vault.settings, file, indent=4)
+        return vault, key
+
+    def _derive(self, passphrase):
+        return hashlib.scrypt(
+            passphrase.encode("utf-8"),
+            salt=base64.b64decode(self.settings["salt"]),
+            n=self.settings["n"],
+            r=self.settings["r"],
+            p=self.settings["p"],
+            maxmem=256 * 1024 * 1024,
+            dklen=32
+        )
+
+    def unlock(self, passphrase):
+        """Derive the vault key, raising VaultError if the passphrase is wrong."""
+        key = self._derive(passphrase)
+        try:
+            decrypt_password(key, {"ciphertext": self.settings["check"]})
+        except VaultError:
+            raise VaultError("Incorrect passphrase")
+        return key
+
+
+class SessionKeys:
+    """
+    Derived vault keys cached per browser session.
+
+    Key derivation is deliberately slow, so it runs once when a session
+    unlocks the vault; later requests look the key up by a random session
+    token. Keys stay in server memory only and expire after a period of
+    inactivity; expired keys are dropped whether or not their session ever
+    comes back.
+    """
+
+    def __init__(self, timeout=SESSION_TIMEOUT, purge_interval=SESSION_PURGE_INTERVAL):
+        self.timeout = timeout
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._next_purge = time.monotonic() + purge_interval
+
+    def add(self, key):
+        """Cache a key and return the token that identifies it."""
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            self._keys[token] = (key, now + self.timeout)
+        return token
+
+    def get(self, token):
+        """Return the key for a token, or None if it's unknown or expired."""
+        if not token:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            item = self._keys.get(token)
+            if item is None:
+                return None
+            key, expires = item
+            if expires < now:
+                del self._keys[token]
+                return None
+            self._keys[token] = (key, now + self.timeout)
+            return key
+
+    def remove(self, token):
+        with self._lock:
+            self._keys.pop(token, None)
+
+    def _purge_expired(self, now):
+        """Drop every expired key, at most once per purge interval. Call with the lock held."""
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval
+        for token, (key, expires) in list(self._keys.items()):
+            if expires < now:
+                del self._keys[token]